@@ -0,0 +1,189 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from config import OUTPUT_DIR
+from game_etl import EXTRACTORS
+from game_etl_core import GameProcessor
+from synthetic_match import generate_match
+
+# Times GameProcessor construction, detect_fights and every study extract on synthetic games
+# while one generator parameter grows, and fits time ~ size^k to tell linear from quadratic.
+
+BASE = {'n_players': 8, 'duration_sec': 300, 'event_rate': 0.85, 'fight_rate': 1.0}
+
+SWEEPS = {
+    'players': ('n_players', [4, 8, 16, 32]),
+    'duration': ('duration_sec', [150, 300, 600, 1200]),
+    'events': ('event_rate', [0.5, 1, 2, 4]),
+    'fights': ('fight_rate', [0.5, 1, 2, 4])
+}
+
+# run as a script in a fresh interpreter so spawned workers re-import it the way they re-import
+# master_analysis.py as __main__
+STARTUP_SCRIPT = '''import json, sys, time
+start = time.perf_counter()
+import master_analysis
+imported = time.perf_counter()
+
+if __name__ == "__main__":
+    from game_etl import process_chunk, init_worker
+    task = json.loads(sys.argv[2])
+    with master_analysis.make_pool(1, init_worker, sys.argv[1]) as pool:
+        pool.submit(process_chunk, [(0, task)]).result()
+    print(json.dumps({'import_s': imported - start, 'first_game_s': time.perf_counter() - start}))
+'''
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def time_game(task, repeat):
+    gid, j_path, u_path, p_paths = task
+    timings = {}
+
+    def build():
+        return GameProcessor(gid, j_path, u_path, p_paths, use_cache=False)
+
+    timings['GameProcessor'] = best_of(build, repeat)
+    processor = build()
+    timings['detect_fights'] = best_of(processor.detect_fights, repeat)
+
+    for key, extract in EXTRACTORS.items():
+        def run():
+            # shared metrics are memoized per processor; clear them so each extract pays its own
+            processor.metrics = {}
+            extract(processor)
+        timings[f"extract:{key}"] = best_of(run, repeat)
+    return timings
+
+
+def scaling_exponent(sizes, seconds):
+    sizes = np.asarray(sizes, dtype=float)
+    seconds = np.maximum(np.asarray(seconds, dtype=float), 1e-6)
+    return float(np.polyfit(np.log(sizes), np.log(seconds), 1)[0])
+
+
+def classify(k):
+    if k < 1.3:
+        return 'linear'
+    if k < 1.7:
+        return 'superlinear'
+    return 'quadratic'
+
+
+def run_sweep(name, repeat, work_dir):
+    param, values = SWEEPS[name]
+    rows = []
+    for i, value in enumerate(values):
+        params = dict(BASE, **{param: value})
+        task = generate_match(os.path.join(work_dir, name), f"g{800000000000000000 + i}", seed=i, **params)
+        for stage, seconds in time_game(task, repeat).items():
+            rows.append({'sweep': name, 'param': param, 'value': value, 'stage': stage, 'seconds': seconds})
+        print(f"  {name}: {param}={value} done")
+    return rows
+
+
+def summarize(rows):
+    summary = []
+    for sweep, stage in dict.fromkeys((r['sweep'], r['stage']) for r in rows):
+        series = [r for r in rows if r['sweep'] == sweep and r['stage'] == stage]
+        k = scaling_exponent([r['value'] for r in series], [r['seconds'] for r in series])
+        summary.append({'sweep': sweep, 'stage': stage, 'exponent': k, 'scaling': classify(k),
+                        'min_s': series[0]['seconds'], 'max_s': series[-1]['seconds']})
+    return summary
+
+
+def write_csv(filename, data):
+    os.makedirs(os.path.join(OUTPUT_DIR, "data"), exist_ok=True)
+    with open(os.path.join(OUTPUT_DIR, "data", filename), 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(data[0].keys()))
+        writer.writeheader()
+        writer.writerows(data)
+
+
+def startup(repeat=3, keep=None):
+    # time from a fresh interpreter to the first extracted game, per start method: importing the
+    # entry point, starting a one-worker pool and extracting one small game in it
+    root = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get('PYTHONPATH')])))
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = keep or tmp
+        os.makedirs(work_dir, exist_ok=True)
+        script = os.path.join(work_dir, "startup_probe.py")
+        with open(script, 'w') as f:
+            f.write(STARTUP_SCRIPT)
+        task = generate_match(os.path.join(work_dir, "startup"), "g700000000000000000", n_players=4, duration_sec=60)
+
+        for method in multiprocessing.get_all_start_methods():
+            best = None
+            for _ in range(repeat):
+                start = time.perf_counter()
+                # run from work_dir so the probe's state cache/intermediate store land there
+                out = subprocess.run([sys.executable, script, method, json.dumps(task)], cwd=work_dir, env=env,
+                                     capture_output=True, text=True, check=True).stdout
+                timing = json.loads(out.strip().splitlines()[-1])
+                timing['process_s'] = time.perf_counter() - start
+                if best is None or timing['first_game_s'] < best['first_game_s']:
+                    best = timing
+            rows.append({'start_method': method, **best})
+            print(f"  {method}: done")
+
+    write_csv("benchmark_startup.csv", rows)
+    print(f"\n {'start method':<14}{'import s':>10}{'first game s':>14}{'process s':>11}")
+    for r in rows:
+        print(f" {r['start_method']:<14}{r['import_s']:>10.3f}{r['first_game_s']:>14.3f}{r['process_s']:>11.3f}")
+    print(f" written to {OUTPUT_DIR}/data/benchmark_startup.csv")
+
+
+def main(sweeps, repeat=3, keep=None):
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = keep or tmp
+        for name in sweeps:
+            print(f"benchmarking {name} sweep")
+            rows += run_sweep(name, repeat, work_dir)
+
+    summary = summarize(rows)
+    write_csv("benchmark_timings.csv", rows)
+    write_csv("benchmark_scaling.csv", summary)
+
+    print(f"\n {'sweep':<10}{'stage':<16}{'first s':>10}{'last s':>10}{'k':>7}  scaling")
+    for s in summary:
+        print(f" {s['sweep']:<10}{s['stage']:<16}{s['min_s']:>10.4f}{s['max_s']:>10.4f}{s['exponent']:>7.2f}  {s['scaling']}")
+    print(f" written to {OUTPUT_DIR}/data/benchmark_timings.csv and benchmark_scaling.csv")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="scaling benchmark of the extraction stage on synthetic games")
+    parser.add_argument("--sweeps", default=','.join(SWEEPS.keys()),
+                        help=f"comma separated sweeps to run (from {', '.join(SWEEPS.keys())})")
+    parser.add_argument("--repeat", type=int, default=3, help="timing repeats per measurement (best is kept)")
+    parser.add_argument("--keep", default=None, help="write the generated games here instead of a temp folder")
+    parser.add_argument("--startup", action="store_true",
+                        help="time a fresh process to its first extracted game per start method instead of the sweeps")
+    args = parser.parse_args()
+
+    if args.startup:
+        startup(repeat=args.repeat, keep=args.keep)
+    else:
+        sweeps = [s.strip() for s in args.sweeps.split(',') if s.strip()]
+        unknown = [s for s in sweeps if s not in SWEEPS]
+        if unknown:
+            parser.error(f"unknown sweep(s): {', '.join(unknown)}")
+        main(sweeps, repeat=args.repeat, keep=args.keep)
@@ -9,4 +9,40 @@ CSV_SAMPLE_COUNT = 1
 STAMPS_THRESHOLD = 30
 HIGH_SPEED_THRESHOLD = 1000
 MIN_NUM_EVENTS = 10
-USE_SINGLE_CORE = False
\ No newline at end of file
+
+# s2 health chain: simulations per start health, bootstrap replicates for the 95% band
+HEALTH_SIMULATIONS_PER_START = 1_000_000
+HEALTH_BOOTSTRAP_REPLICATES = 200
+HEALTH_BOOTSTRAP_SIMULATIONS = 20_000
+HEALTH_SEED = 0
+
+# s3 GLM on item x start_dist bin x start_health x win groups (False: per row)
+S3_GROUPED_GLM = True
+S3_DIST_BIN = 100.0
+
+# s4 heatmap grid cells per side (VOXEL_SIZE above is the clustering cell)
+DENSITY_GRID_SIZE = 256
+
+# s6 speed grid before each elim (seconds, points, largest gap bridged)
+VELOCITY_WINDOW_S = 5.0
+VELOCITY_GRID_STEPS = 11
+VELOCITY_MAX_GAP_S = 1.0
+
+# None uses every core, 1 runs in-process
+N_WORKERS = None
+# None keeps workers for the whole run; not allowed with START_METHOD 'fork'
+MAX_TASKS_PER_CHILD = None
+CHUNKS_PER_WORKER = 4
+# 'fork', 'spawn', 'forkserver' or None for the platform default
+START_METHOD = None
+
+# or --profile
+PROFILE = False
+PROFILE_TOP_N = 15
+
+CACHE_DIR = "cache"
+USE_STATE_CACHE = True
+INTERMEDIATE_DIR = f"{CACHE_DIR}/intermediate"
+USE_INTERMEDIATE_STORE = True
+# used by --incremental
+LEDGER_PATH = f"{CACHE_DIR}/ledger.json"
@@ -0,0 +1,139 @@
+import numpy as np
+from config import STAMPS_PER_SECOND
+
+# Per-game products that more than one study needs. GameProcessor.metric(name) computes each
+# one on first request and keeps it in processor.metrics, so it runs at most once per game.
+
+
+def playtimes(processor):
+    last_stamp = processor.events[-1].get('stamp', 0) if processor.events else 0
+    user_playtimes = {}
+    for user, raw_ids in processor.username_map.items():
+        playtime_sec = 0
+        for raw_id in raw_ids:
+            if raw_id in processor.id_history:
+                for seg in processor.id_history[raw_id]:
+                    if seg['user'] == user:
+                        end = min(seg['end'], last_stamp)
+                        playtime_sec += (end - seg['start']) / STAMPS_PER_SECOND
+        user_playtimes[user] = playtime_sec
+    return user_playtimes
+
+
+def user_teams(processor):
+    teams = {}
+    for e in processor.event_index.query('set_team'):
+        u = processor.resolve_user(e.get('player'), e.get('stamp'))
+        teams[u] = e.get('team')
+    return teams
+
+
+def kill_death_counts(processor):
+    elims = processor.event_index.query('elim')
+    elim_t = [e.get('stamp') for e in elims]
+    killers = processor.resolve_users([e.get('instigator') for e in elims], elim_t)
+    victims = processor.resolve_users([e.get('target') for e in elims], elim_t)
+
+    kills_by_user = {}
+    deaths_by_user = {}
+    for e, killer, victim in zip(elims, killers, victims):
+        if e.get('instigator') != e.get('target'):
+            kills_by_user[killer] = kills_by_user.get(killer, 0) + 1
+        deaths_by_user[victim] = deaths_by_user.get(victim, 0) + 1
+    return {'kills': kills_by_user, 'deaths': deaths_by_user}
+
+
+def player_stats(processor):
+    raw_winner = processor.json_data.get('winner')
+    winning_team = processor.json_data.get('winning team')
+    duration = processor.json_data.get('DurationSec', 0)
+
+    teams = processor.metric('user_teams')
+    counts = processor.metric('kill_death_counts')
+    times = processor.metric('playtimes')
+
+    players = {}
+    for user in set(processor.username_map.keys()):
+        did_win = 0
+        if winning_team is not None:
+            if teams.get(user, -1) == winning_team:
+                did_win = 1
+        elif raw_winner:
+            if user == raw_winner:
+                did_win = 1
+            elif isinstance(raw_winner, int):
+                if processor.resolve_user(raw_winner, duration) == user:
+                    did_win = 1
+
+        players[user] = {
+            'kills': counts['kills'].get(user, 0),
+            'deaths': counts['deaths'].get(user, 0),
+            'playtime': times[user],
+            'won': did_win,
+            'team': teams.get(user, -1)
+        }
+    return players
+
+
+PERF_SUMMARY_COLUMNS = ['GPU Bound', 'GT Bound', 'NTT Bound', 'Packet Latency', 'Frame Avg']
+
+
+def perf_summaries(processor):
+    summaries = {}
+    for username, df in processor.perf_dfs.items():
+        if df is None or df.empty: continue
+
+        p_stats = {
+            'gpu_bound_frames': 0,
+            'nettick_bound_frames': 0,
+            'gt_bound_frames': 0,
+            'total_frames': len(df),
+            'avg_latency': 0,
+            'avg_fps': 0
+        }
+
+        if 'GPU Bound' in df.columns: p_stats['gpu_bound_frames'] = int(df['GPU Bound'].sum())
+        if 'GT Bound' in df.columns: p_stats['gt_bound_frames'] = int(df['GT Bound'].sum())
+        if 'NTT Bound' in df.columns: p_stats['nettick_bound_frames'] = int(df['NTT Bound'].sum())
+
+        if 'Packet Latency' in df.columns:
+            p_stats['avg_latency'] = float(df['Packet Latency'].mean())
+            p_stats['all_latencies'] = df['Packet Latency'].astype(float).tolist()
+
+        if 'Frame Avg' in df.columns:
+            avg_frame_ms = df['Frame Avg'].mean()
+            p_stats['avg_fps'] = 1000.0 / avg_frame_ms if avg_frame_ms > 0 else 0
+
+        summaries[username] = p_stats
+    return summaries
+
+
+def speeds(processor):
+    # speed of every PlayerUpdate row, in telemetry index order (by PlayerId, then Stamp)
+    if not processor.telemetry.has_vector('velocity'):
+        return np.empty(0)
+    return np.linalg.norm(processor.telemetry.vectors['velocity'], axis=1)
+
+
+def idle_times(processor):
+    values = []
+    for f in processor.fights:
+        values.extend(f['idle_pre'].values())
+    return values
+
+
+PRODUCTS = {
+    'playtimes': playtimes,
+    'user_teams': user_teams,
+    'kill_death_counts': kill_death_counts,
+    'player_stats': player_stats,
+    'perf_summaries': perf_summaries,
+    'speeds': speeds,
+    'idle_times': idle_times
+}
+
+
+def compute(processor, name):
+    if name not in PRODUCTS:
+        raise KeyError(f"unknown derived metric '{name}'")
+    return PRODUCTS[name](processor)
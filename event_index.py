@@ -0,0 +1,59 @@
+import numpy as np
+
+ROLES = ('player', 'instigator', 'target')
+
+
+class EventGroup:
+    def __init__(self, events):
+        # stable sort keeps the original event order for identical stamps
+        self.events = sorted(events, key=lambda e: e.get('stamp', 0))
+        self.stamps = np.array([e.get('stamp', 0) for e in self.events])
+
+    def __len__(self):
+        return len(self.events)
+
+    def span(self, start=None, end=None):
+        lo = 0 if start is None else int(np.searchsorted(self.stamps, start, side='left'))
+        hi = len(self.events) if end is None else int(np.searchsorted(self.stamps, end, side='right'))
+        return lo, max(lo, hi)
+
+
+_EMPTY = EventGroup([])
+
+
+class EventIndex:
+    # groups events by name, and by (role, raw id) with and without a name filter,
+    # so "player 3's dash events in [t - 10s, t]" is two binary searches
+
+    def __init__(self, events):
+        groups = {}
+        for e in events:
+            name = e.get('name')
+            groups.setdefault((name, None, None), []).append(e)
+            for role in ROLES:
+                pid = e.get(role)
+                if pid is None:
+                    continue
+                groups.setdefault((None, role, pid), []).append(e)
+                groups.setdefault((name, role, pid), []).append(e)
+
+        self.groups = {key: EventGroup(evs) for key, evs in groups.items()}
+
+    def group(self, name=None, pid=None, role='player'):
+        if pid is None:
+            return self.groups.get((name, None, None), _EMPTY)
+        return self.groups.get((name, role, pid), _EMPTY)
+
+    def query(self, name=None, pid=None, role='player', start=None, end=None):
+        # events (optionally of one name, optionally of one id in one role) with start <= stamp <= end
+        if name is None and pid is None:
+            raise ValueError("query needs a name, a pid or both")
+        g = self.group(name, pid, role)
+        lo, hi = g.span(start, end)
+        return g.events[lo:hi]
+
+    def count(self, name=None, pid=None, role='player', start=None, end=None):
+        if name is None and pid is None:
+            raise ValueError("count needs a name, a pid or both")
+        lo, hi = self.group(name, pid, role).span(start, end)
+        return hi - lo
@@ -0,0 +1,10 @@
+import pandas as pd
+
+
+def read_export_csv(path, usecols=None, dtype=None):
+    # PlayerUpdate/Performance CSVs are written with ", " separators ("Stamp, PlayerId, ..."), so
+    # skipinitialspace strips the names and values; usecols (None = all) skips the other columns
+    if usecols is not None:
+        wanted = set(usecols)
+        usecols = lambda c: c in wanted
+    return pd.read_csv(path, engine='c', skipinitialspace=True, usecols=usecols, dtype=dtype)
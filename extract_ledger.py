@@ -0,0 +1,76 @@
+import glob
+import hashlib
+import json
+import os
+
+from config import LEDGER_PATH
+from intermediate_store import StoredGame, study_path
+from state_cache import VERSION_SOURCES, VERSION_CONFIG, code_version, hash_file
+
+# code whose output ends up in the stored extracts; editing any of it re-extracts every game
+EXTRACT_SOURCES = VERSION_SOURCES + [
+    'game_etl.py', 'derived_metrics.py', 'intermediate_store.py', 'event_index.py'
+]
+# config values the study extracts read, on top of the state rebuild's
+EXTRACT_CONFIG = VERSION_CONFIG + [
+    'CSV_SAMPLE_COUNT', 'HIGH_SPEED_THRESHOLD', 'VELOCITY_WINDOW_S', 'VELOCITY_GRID_STEPS', 'VELOCITY_MAX_GAP_S'
+]
+
+_EXTRACT_VERSION = None
+
+
+def extract_version():
+    global _EXTRACT_VERSION
+    if _EXTRACT_VERSION is None:
+        root = os.path.dirname(os.path.abspath(__file__))
+        studies = sorted(os.path.relpath(p, root) for p in glob.glob(os.path.join(root, "studies", "*_etl.py")))
+        _EXTRACT_VERSION = code_version(EXTRACT_SOURCES + studies, EXTRACT_CONFIG)
+    return _EXTRACT_VERSION
+
+
+def game_fingerprint(task):
+    _, j_path, u_path, p_paths = task
+    h = hashlib.sha1(extract_version().encode())
+    for path in [j_path, u_path] + sorted(p_paths):
+        h.update(os.path.basename(path).encode())
+        hash_file(path, h)
+    return h.hexdigest()
+
+
+def load_ledger():
+    if not os.path.exists(LEDGER_PATH):
+        return {}
+    try:
+        with open(LEDGER_PATH) as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"ignoring unreadable ledger {LEDGER_PATH}: {e}")
+        return {}
+
+
+def save_ledger(ledger):
+    os.makedirs(os.path.dirname(LEDGER_PATH), exist_ok=True)
+    tmp_path = f"{LEDGER_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(ledger, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, LEDGER_PATH)
+
+
+def stored_game(ledger, game_id, fingerprint, extract_keys):
+    # handle to the stored extracts of an unchanged game, or None if it has to be extracted again
+    entry = ledger.get(game_id)
+    if entry is None or entry['fingerprint'] != fingerprint:
+        return None
+    if any(key not in entry['keys'] for key in extract_keys):
+        return None
+    if not all(os.path.exists(study_path(game_id, key)) for key in extract_keys):
+        return None
+    return StoredGame(game_id, extract_keys, {})
+
+
+def record(ledger, game_id, fingerprint, handle):
+    entry = ledger.get(game_id)
+    keys = list(handle.keys_stored)
+    if entry is not None and entry['fingerprint'] == fingerprint:
+        keys += [key for key in entry['keys'] if key not in keys]
+    ledger[game_id] = {'fingerprint': fingerprint, 'keys': keys}
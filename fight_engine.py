@@ -0,0 +1,40 @@
+ACTION_TYPES = ('fire', 'throw', 'swing', 'stab', 'burst')
+RELEVANT_TYPES = {'damage', 'elim', *ACTION_TYPES}
+LOOKBACK_STAMPS = 120
+TIMEOUT_STAMPS = 240
+
+CAUSER_ITEMS = {
+    'Boomerang': 'Boomerang', 'Throwing Star': 'ThrowingStar',
+    'Rocket': 'RocketLauncher', 'Sledge': 'Sledge',
+    'Net': 'Net', 'Projectile': 'Ripper', 'KinematicStar': 'Environment'
+}
+
+
+def damage_item(e):
+    item_used = e.get('item', 'Unknown')
+    if item_used == 'Unknown':
+        causer = e.get('causer') or ""
+        for key, value in CAUSER_ITEMS.items():
+            if key in causer:
+                return value
+        if ('MapCollider' in causer) or ('Astronaut' in causer):
+            return 'Kick'
+    return item_used
+
+
+def actions_by_player(events):
+    actions = {}
+    for e in events:
+        if e.get('name') in ACTION_TYPES:
+            pid = e.get('player')
+            if pid is not None:
+                if pid not in actions: actions[pid] = []
+                actions[pid].append(e.get('stamp'))
+    return actions
+
+
+def relevant_timeline(events):
+    return sorted(
+        [e for e in events if e.get('name') in RELEVANT_TYPES],
+        key=lambda x: x.get('stamp', 0)
+    )
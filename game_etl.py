@@ -1,5 +1,13 @@
+import io
+import os
 import traceback
-from game_etl_core import GameProcessor
+from config import USE_INTERMEDIATE_STORE
+from game_etl_core import GameProcessor, CORE_UPDATE_COLUMNS
+from export_csv import read_export_csv
+from telemetry_index import UPDATE_DTYPES
+from derived_metrics import PERF_SUMMARY_COLUMNS
+from intermediate_store import write_game
+from profiler import Profiler, phase
 
 from studies import (
     s0_metadata_etl,
@@ -18,32 +26,117 @@ from studies import (
     s13_idle_etl
 )
 
-def process_single_file(file_group):
+EXTRACTORS = {
+    'S0': s0_metadata_etl.extract,
+    'S1': s1_summary_etl.extract,
+    'S2': s2_health_etl.extract,
+    'S3': s3_winrate_etl.extract,
+    'S4': s4_spatial_etl.extract,
+    'S5': s5_sequence_etl.extract,
+    'S6': s6_velocity_etl.extract,
+    'S7': s7_survival_etl.extract,
+    'S8': s8_trueskill_etl.extract,
+    'S9': s9_archetype_etl.extract,
+    'S10': s10_performance_etl.extract,
+    'S11': s11_niche_etl.extract,
+    'S12': s12_path_etl.extract,
+    'S13': s13_idle_etl.extract
+}
+
+VELOCITY_COLUMNS = ['Velocity.X', 'Velocity.Y', 'Velocity.Z']
+
+# PlayerUpdate columns each extract reads on top of CORE_UPDATE_COLUMNS
+UPDATE_COLUMNS = {
+    'S1': ['Rotation.Roll'] + VELOCITY_COLUMNS,
+    'S5': VELOCITY_COLUMNS,
+    'S6': VELOCITY_COLUMNS,
+    'S9': ['Rotation.Roll'] + VELOCITY_COLUMNS
+}
+
+# Performance CSV columns each extract reads; the files are only parsed if one of them is selected
+PERF_COLUMNS = {
+    'S1': PERF_SUMMARY_COLUMNS,
+    'S10': PERF_SUMMARY_COLUMNS
+}
+
+def update_columns(extract_keys=None):
+    columns = list(CORE_UPDATE_COLUMNS)
+    for key in (extract_keys if extract_keys is not None else EXTRACTORS.keys()):
+        columns += [c for c in UPDATE_COLUMNS.get(key, []) if c not in columns]
+    return columns
+
+def perf_columns(extract_keys=None):
+    columns = []
+    for key in (extract_keys if extract_keys is not None else EXTRACTORS.keys()):
+        columns += [c for c in PERF_COLUMNS.get(key, []) if c not in columns]
+    return columns
+
+def init_worker():
+    # pool initializer for extraction workers: they only need the ETL stack (imported with this
+    # module), and the first read_csv sets up pandas' parser, so pay that before the first game
+    read_export_csv(io.StringIO("Stamp, PlayerId\n0, 0\n"), dtype=UPDATE_DTYPES)
+
+def process_single_file(file_group, extract_keys=None, profile=False):
     gid, j_path, u_path, p_paths_list = file_group
+    profiler = Profiler(gid) if profile else None
     
     try:
-        processor = GameProcessor(gid, j_path, u_path, p_paths_list)
+        processor = GameProcessor(gid, j_path, u_path, p_paths_list, profiler=profiler,
+                                  update_columns=update_columns(extract_keys), perf_columns=perf_columns(extract_keys))
         
         results = {}
         
-        results['S0'] = s0_metadata_etl.extract(processor)
-        results['S1'] = s1_summary_etl.extract(processor)
-        results['S2'] = s2_health_etl.extract(processor)
-        results['S3'] = s3_winrate_etl.extract(processor)
-        results['S4'] = s4_spatial_etl.extract(processor)
-        results['S5'] = s5_sequence_etl.extract(processor)
-        results['S6'] = s6_velocity_etl.extract(processor)
-        results['S7'] = s7_survival_etl.extract(processor)
-        results['S8'] = s8_trueskill_etl.extract(processor)
-        results['S9'] = s9_archetype_etl.extract(processor)
-        results['S10'] = s10_performance_etl.extract(processor)
-        results['S11'] = s11_niche_etl.extract(processor)
-        results['S12'] = s12_path_etl.extract(processor)
-        results['S13'] = s13_idle_etl.extract(processor)
+        for key in (extract_keys if extract_keys is not None else EXTRACTORS.keys()):
+            with phase(profiler, 'extract', key):
+                results[key] = EXTRACTORS[key](processor)
+
+        results['load_stats'] = processor.load_stats
+
+        if profiler is not None:
+            # the handle keeps this same list, so the write_store phase below still lands in it
+            results['profile'] = profiler.records
 
+        if USE_INTERMEDIATE_STORE:
+            with phase(profiler, 'game', 'write_store'):
+                results = write_game(gid, results)
+
+        if profiler is not None:
+            profiler.finish()
         return results
 
     except Exception as e:
         print(f"failed {gid}: {e}")
         traceback.print_exc()
-        return None
\ No newline at end of file
+        if profiler is not None:
+            profiler.finish()
+        return None
+
+
+def task_cost(file_group):
+    # extraction time grows with the size of the match JSON and the telemetry/performance CSVs
+    _, j_path, u_path, p_paths_list = file_group
+    return sum(os.path.getsize(p) for p in [j_path, u_path] + list(p_paths_list) if os.path.exists(p))
+
+
+def plan_chunks(tasks, indices, n_chunks):
+    # largest tasks first; consecutive tasks are packed until a chunk holds ~1/n_chunks of the
+    # total cost, so giant games run alone and early and the small ones share the tail
+    costs = {i: task_cost(tasks[i]) for i in indices}
+    order = sorted(indices, key=lambda i: costs[i], reverse=True)
+    target = sum(costs.values()) / max(1, n_chunks)
+
+    chunks = []
+    chunk, chunk_cost = [], 0
+    for i in order:
+        chunk.append(i)
+        chunk_cost += costs[i]
+        if chunk_cost >= target:
+            chunks.append(chunk)
+            chunk, chunk_cost = [], 0
+    if chunk:
+        chunks.append(chunk)
+    return chunks
+
+
+def process_chunk(indexed_tasks, extract_keys=None, profile=False):
+    return [(i, process_single_file(task, extract_keys, profile)) for i, task in indexed_tasks]
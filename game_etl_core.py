@@ -1,59 +1,94 @@
 import os
 import pandas as pd
 import numpy as np
-import json
 import re
+from bisect import bisect_left, bisect_right
 from config import *
+from match_loader import load_match
+from state_cache import CACHED_ATTRS, state_key, load_state, save_state
+from telemetry_index import TelemetryIndex, read_updates
+from export_csv import read_export_csv
+from event_index import EventIndex
+from weapon_index import WeaponIndex
+from session_index import SessionIndex
+import derived_metrics
+from profiler import phase
+from fight_engine import (
+    ACTION_TYPES, LOOKBACK_STAMPS, TIMEOUT_STAMPS,
+    actions_by_player, damage_item, relevant_timeline
+)
+
+# PlayerUpdate columns GameProcessor itself reads (identities, fight start health/position)
+CORE_UPDATE_COLUMNS = ['Stamp', 'PlayerId', 'Health', 'Location.X', 'Location.Y', 'Location.Z']
 
 class GameProcessor:
-    def __init__(self, game_id, json_path, update_path, perf_paths_list):
+    def __init__(self, game_id, json_path, update_path, perf_paths_list, use_cache=USE_STATE_CACHE, profiler=None,
+                 update_columns=None, perf_columns=None):
         self.game_id = game_id
-        self.json_data = self._load_clean_json(json_path)
-        self.df_update = pd.read_csv(update_path)
-        self.df_update.columns = self.df_update.columns.str.strip()
-        self.perf_dfs = {}
-        
-        if perf_paths_list:
-            for path in perf_paths_list:
-                try:
-                    filename = os.path.basename(path)
-                    match = re.search(r"Performance_(.*?)_" + re.escape(game_id), filename)
-                    if match:
-                        username = match.group(1)
-                        self.perf_dfs[username] = pd.read_csv(path)
-                        self.perf_dfs[username].columns = self.perf_dfs[username].columns.str.strip()
-                except Exception as e:
-                    print(f"error loading perf file {path}: {e}")        
-
-        self.events = list(self.json_data.get('events', []))
+        self.profiler = profiler
+        with phase(profiler, 'game', 'load_json'):
+            self.json_data = self._load_clean_json(json_path)
+        with phase(profiler, 'game', 'read_update_csv'):
+            df_update = read_updates(update_path, update_columns)
+        with phase(profiler, 'game', 'telemetry_index'):
+            # the index keeps the only (sorted) copy of the PlayerUpdate rows
+            self.telemetry = TelemetryIndex(df_update)
+        del df_update
+        # Performance CSVs are parsed on first access to perf_dfs, keeping only perf_columns (None = all)
+        self.perf_paths = {}
+        for path in perf_paths_list or []:
+            match = re.search(r"Performance_(.*?)_" + re.escape(game_id), os.path.basename(path))
+            if match:
+                self.perf_paths[match.group(1)] = path
+        self.perf_columns = perf_columns
+        self._perf_dfs = None
+
+        with phase(profiler, 'game', 'event_index'):
+            self.events = list(self.json_data.get('events', []))
+            self.event_index = EventIndex(self.events)
         self.id_map = {}           
         self.username_map = {}    
         self.player_loadouts = {} 
         self.fights = []           
         self.metrics = {}
-        
-        self._reconstruct_gamestate()
-        self.detect_fights()
+        self.loaded_from_cache = False
+
+        cached = None
+        if use_cache:
+            with phase(profiler, 'game', 'load_state_cache'):
+                cache_key = state_key(json_path, update_path)
+                cached = load_state(game_id, cache_key)
+
+        if cached is not None:
+            for attr in CACHED_ATTRS:
+                setattr(self, attr, cached[attr])
+            with phase(profiler, 'game', 'index_state'):
+                self._index_state()
+            self.loaded_from_cache = True
+        else:
+            with phase(profiler, 'game', 'reconstruct_gamestate'):
+                self._reconstruct_gamestate()
+            self.detect_fights()
+            if use_cache:
+                with phase(profiler, 'game', 'save_state_cache'):
+                    save_state(game_id, cache_key, {attr: getattr(self, attr) for attr in CACHED_ATTRS})
+
+    @property
+    def perf_dfs(self):
+        if self._perf_dfs is None:
+            self._perf_dfs = {}
+            if self.perf_paths:
+                with phase(self.profiler, 'game', 'read_perf_csvs'):
+                    for username, path in self.perf_paths.items():
+                        try:
+                            self._perf_dfs[username] = read_export_csv(path, self.perf_columns)
+                        except Exception as e:
+                            print(f"error loading perf file {path}: {e}")
+        return self._perf_dfs
 
     def _load_clean_json(self, path):
-        try:
-            with open(path, 'r', encoding='utf-8-sig') as f: raw = f.read()
-        except UnicodeDecodeError:
-            try:
-                with open(path, 'r', encoding='utf-16') as f: raw = f.read()
-            except:
-                with open(path, 'r', encoding='utf-16-le') as f: raw = f.read()
-
-        raw = raw.strip()
-        if not raw: return {}
-
-        fixed = re.sub(r'(\d+)\.(\s*[,\]\}])', r'\1.0\2', raw)
-        fixed = re.sub(r',\s*([}\]])', r'\1', fixed)
-
-        try:
-            return json.loads(fixed)
-        except json.JSONDecodeError:
-            return {}
+        data, self.load_stats = load_match(path)
+        return data
 
     def _reconstruct_gamestate(self):
         self.id_history = {} 
@@ -91,7 +126,7 @@ class GameProcessor:
                             entry['end'] = t
                             break
 
-        unique_csv_ids = self.df_update['PlayerId'].unique()
+        unique_csv_ids = self.telemetry.player_ids()
         for uid in unique_csv_ids:
             if uid not in self.id_history:
                  self.id_history[uid] = [{'start': 0, 'end': max_time, 'user': f"Unknown_{uid}"}]
@@ -108,53 +143,51 @@ class GameProcessor:
                 item = e.get('item', 'Default')
                 self.weapon_timeline.append({'time': t, 'pid': pid, 'item': item})
             
+        self._index_state()
+
+    def _index_state(self):
+        self.sessions = SessionIndex(self.id_history)
         self.df_weapons = pd.DataFrame(self.weapon_timeline)
+        self.weapons = WeaponIndex(self.weapon_timeline)
+
+    def metric(self, name):
+        if name not in self.metrics:
+            self.metrics[name] = derived_metrics.compute(self, name)
+        return self.metrics[name]
 
     def get_weapon_at_time(self, pid, timestamp):
-        if self.df_weapons.empty:
-            return "Default"
         session_start = self.get_id_session_start(pid, timestamp)
-        relevant = self.df_weapons[
-            (self.df_weapons['pid'] == pid) & 
-            (self.df_weapons['time'] >= session_start) & 
-            (self.df_weapons['time'] <= timestamp)
-        ]
-        if relevant.empty: return "Default"
-        return relevant.iloc[-1]['item']
+        return self.weapons.item_at(pid, timestamp, session_start)
+
+    def get_weapons_at_times(self, pids, timestamps):
+        session_starts = self.sessions.starts_at(pids, timestamps)
+        return self.weapons.items_at(pids, timestamps, session_starts)
 
     def get_id_session_start(self, raw_id, timestamp):
-        if raw_id not in self.id_history:
-            return 0
-        for segment in self.id_history[raw_id]:
-            if segment['start'] <= timestamp <= segment['end']:
-                return segment['start']
-        return self.id_history[raw_id][-1]['start']
+        return self.sessions.start_at(raw_id, timestamp)
 
     def resolve_user(self, raw_id, timestamp):
-        if raw_id not in self.id_history:
-            return f"Unknown_{raw_id}"
-        for segment in self.id_history[raw_id]:
-            if segment['start'] <= timestamp <= segment['end']:
-                return segment['user']
-        return self.id_history[raw_id][-1]['user']
+        return self.sessions.user_at(raw_id, timestamp)
+
+    def resolve_users(self, raw_ids, timestamps):
+        return self.sessions.users_at(raw_ids, timestamps)
 
     def detect_fights(self):
-        LOOKBACK_STAMPS = 120
-        TIMEOUT_STAMPS = 240
-        
-        actions_by_player = {}
-        for e in self.events:
-            if e.get('name') in ['fire', 'throw', 'swing', 'stab', 'burst']:
-                pid = e.get('player')
-                if pid is not None:
-                    if pid not in actions_by_player: actions_by_player[pid] = []
-                    actions_by_player[pid].append(e.get('stamp'))
-        
-        relevant_types = {'damage', 'fire', 'throw', 'swing', 'stab', 'burst', 'elim'}
-        timeline = sorted(
-            [e for e in self.events if e.get('name') in relevant_types], 
-            key=lambda x: x.get('stamp', 0)
-        )
+        with phase(self.profiler, 'game', 'detect_fights'):
+            finished_fights = self._detect_fights_sequential()
+
+        self.fights = []
+        # per user: ends of their finalized fights, kept as a stack with strictly increasing ends.
+        # A fight whose end is >= a later fight's end can never be the "latest earlier fight"
+        # for any start stamp, so it is dropped when the later one is pushed.
+        self._fight_end_stacks = {}
+        with phase(self.profiler, 'game', 'finalize_fights'):
+            for f in finished_fights:
+                self._finalize_fight(f)
+
+    def _detect_fights_sequential(self):
+        actions = actions_by_player(self.events)
+        timeline = relevant_timeline(self.events)
         
         active_fights = {} 
         finished_fights = []
@@ -173,7 +206,7 @@ class GameProcessor:
             for pair in to_close:
                 del active_fights[pair]
 
-            if etype in ['fire', 'throw', 'swing', 'burst', 'stab']:
+            if etype in ACTION_TYPES:
                 pid = e.get('player')
                 for pair, fight in active_fights.items():
                     if pid in pair:
@@ -189,22 +222,7 @@ class GameProcessor:
 
                 pair = frozenset({p1, p2})
                 dmg_val = e.get('damage', 0)
-                item_used = e.get('item', 'Unknown')
-
-                if item_used == 'Unknown':
-                    causer = e.get('causer') or ""
-                    mapping = {
-                        'Boomerang': 'Boomerang', 'Throwing Star': 'ThrowingStar',
-                        'Rocket': 'RocketLauncher', 'Sledge': 'Sledge',
-                        'Net': 'Net', 'Projectile': 'Ripper', 'KinematicStar': 'Environment'
-                    }
-                    for key, value in mapping.items():
-                        if key in causer:
-                            item_used = value
-                            break
-                    if item_used == 'Unknown':
-                        if ('MapCollider' in causer) or ('Astronaut' in causer):
-                            item_used = 'Kick'
+                item_used = damage_item(e)
 
                 if pair in active_fights:
                     active_fights[pair]['last_action_time'] = t
@@ -221,7 +239,7 @@ class GameProcessor:
                     candidates = []
                     start_window = t - LOOKBACK_STAMPS
                     for pid in pair:
-                        p_acts = actions_by_player.get(pid, [])
+                        p_acts = actions.get(pid, [])
                         for act_t in p_acts:
                             if act_t > t:
                                 break 
@@ -265,10 +283,8 @@ class GameProcessor:
             fight['end_reason'] = 'timeout'
             fight['end_time'] = fight['last_action_time']
             finished_fights.append(fight)
-            
-        self.fights = []
-        for f in finished_fights:
-            self._finalize_fight(f)
+
+        return finished_fights
 
     def _finalize_fight(self, fight_data):
         start_t = fight_data['start_time']
@@ -281,11 +297,6 @@ class GameProcessor:
         winner_id = fight_data.get('winner')
         winner_user = self.resolve_user(winner_id, end_t) if winner_id is not None else None
 
-        start_frame = self.df_update[
-            (self.df_update['Stamp'] >= start_t - STAMPS_THRESHOLD) & 
-            (self.df_update['Stamp'] <= start_t + STAMPS_THRESHOLD)
-        ]
-
         participant_details = {} 
         start_healths = {} 
         positions = {}
@@ -296,20 +307,19 @@ class GameProcessor:
             uname = user_participants[i]
             
             last_fight_end = -999999
-            for f in reversed(self.fights):
-                if uname in f['participants_user'] and f['end_stamp'] < start_t:
-                    last_fight_end = f['end_stamp']
-                    break
+            ends = self._fight_end_stacks.get(uname)
+            if ends:
+                j = bisect_left(ends, start_t)
+                if j > 0:
+                    last_fight_end = ends[j - 1]
             
             last_spawn = -999999
             session_start = self.get_id_session_start(raw_pid, start_t)
             if raw_pid in self.spawn_index:
-                for s_time in reversed(self.spawn_index[raw_pid]):
-                    if s_time <= start_t:
-                        if s_time < session_start:
-                            break
-                        last_spawn = s_time
-                        break
+                spawns = self.spawn_index[raw_pid]
+                j = bisect_right(spawns, start_t)
+                if j > 0 and spawns[j - 1] >= session_start:
+                    last_spawn = spawns[j - 1]
             
             ref_time = max(last_fight_end, last_spawn)
             if ref_time == -999999:
@@ -327,11 +337,11 @@ class GameProcessor:
 
             health = DEFAULT_HEALTH
             pos = np.array([0,0,0])
-            p_rows = start_frame[start_frame['PlayerId'] == raw_pid]
-            if not p_rows.empty:
-                row = p_rows.iloc[0]
-                health = row['Health']
-                pos = np.array([row['Location.X'], row['Location.Y'], row['Location.Z']])
+            p_rows = self.telemetry.window(raw_pid, start_t - STAMPS_THRESHOLD, start_t + STAMPS_THRESHOLD)
+            if p_rows.stop > p_rows.start:
+                # plain Python/float64 values, the telemetry itself is stored in narrow dtypes
+                health = int(self.telemetry.get('Health', p_rows.start))
+                pos = self.telemetry.vector('location', p_rows.start).astype(np.float64)
             
             start_healths[uname] = health
             positions[raw_pid] = pos
@@ -340,7 +350,8 @@ class GameProcessor:
                 'items_used': items_damage_dict,
                 'total_damage_dealt': sum(items_damage_dict.values()),
                 'start_health': health,
-                'start_pos': pos.tolist()
+                # the export writes whole map units
+                'start_pos': [int(v) if v == int(v) else v for v in pos.tolist()]
             }
 
         for e in fight_data['events']:
@@ -375,4 +386,10 @@ class GameProcessor:
             'damage_total': fight_data['damage_total'],
             'end_reason': fight_data['end_reason']
         }
-        self.fights.append(fight_obj)
\ No newline at end of file
+        self.fights.append(fight_obj)
+
+        for uname in user_participants:
+            ends = self._fight_end_stacks.setdefault(uname, [])
+            while ends and ends[-1] >= end_t:
+                ends.pop()
+            ends.append(end_t)
\ No newline at end of file
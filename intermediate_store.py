@@ -0,0 +1,124 @@
+import os
+import pickle
+from collections.abc import Mapping
+
+import numpy as np
+
+from config import INTERMEDIATE_DIR
+
+# numeric lists/arrays at least this long are stored as columns instead of inside the pickle
+MIN_COLUMN_LENGTH = 256
+
+# values kept inline in the handle (small, read by the parent process itself)
+INLINE_KEYS = ['load_stats', 'profile']
+
+
+class _Column:
+    # placeholder left in the pickled skeleton for a value stored as an npz array
+    def __init__(self, name, kind):
+        self.name = name
+        self.kind = kind
+
+
+def _column_kind(value):
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind in 'biuf' and value.size >= MIN_COLUMN_LENGTH:
+            return 'array'
+        return None
+    if not isinstance(value, list) or len(value) < MIN_COLUMN_LENGTH:
+        return None
+    types = set(map(type, value))
+    if len(types) != 1:
+        return None
+    t = types.pop()
+    if t is float or t is int:
+        return 'list'
+    if issubclass(t, np.number):
+        return 'scalars'
+    return None
+
+
+def _split(value, columns):
+    kind = _column_kind(value)
+    if kind is not None:
+        name = f"c{len(columns)}"
+        columns[name] = np.asarray(value)
+        return _Column(name, kind)
+    if isinstance(value, dict):
+        return {k: _split(v, columns) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_split(v, columns) for v in value]
+    return value
+
+
+def _join(value, columns):
+    if isinstance(value, _Column):
+        arr = columns[value.name]
+        if value.kind == 'list':
+            return arr.tolist()
+        if value.kind == 'scalars':
+            return list(arr)
+        return arr
+    if isinstance(value, dict):
+        return {k: _join(v, columns) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_join(v, columns) for v in value]
+    return value
+
+
+def study_path(game_id, key):
+    return os.path.join(INTERMEDIATE_DIR, game_id, f"{key}.npz")
+
+
+def write_study(game_id, key, value):
+    columns = {}
+    skeleton = _split(value, columns)
+    columns['skeleton'] = np.frombuffer(pickle.dumps(skeleton, protocol=pickle.HIGHEST_PROTOCOL), dtype=np.uint8)
+
+    path = study_path(game_id, key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez(tmp_path, **columns)
+    os.replace(tmp_path, path)
+
+
+def read_study(game_id, key):
+    with np.load(study_path(game_id, key)) as npz:
+        columns = {name: npz[name] for name in npz.files}
+    skeleton = pickle.loads(columns.pop('skeleton').tobytes())
+    return _join(skeleton, columns)
+
+
+class StoredGame(Mapping):
+    # Handle to one game's extracted results. Study outputs live on disk and are read on access
+    # (and not kept), so the handle pickles to a few hundred bytes between processes.
+
+    def __init__(self, game_id, keys, inline):
+        self.game_id = game_id
+        self.keys_stored = list(keys)
+        self.inline = inline
+
+    def __getitem__(self, key):
+        if key in self.inline:
+            return self.inline[key]
+        if key not in self.keys_stored:
+            raise KeyError(key)
+        return read_study(self.game_id, key)
+
+    def __contains__(self, key):
+        return key in self.inline or key in self.keys_stored
+
+    def __iter__(self):
+        yield from self.keys_stored
+        yield from self.inline
+
+    def __len__(self):
+        return len(self.keys_stored) + len(self.inline)
+
+
+def write_game(game_id, results):
+    inline = {k: results[k] for k in INLINE_KEYS if k in results}
+    keys = [k for k in results if k not in inline]
+    for key in keys:
+        write_study(game_id, key, results[key])
+    return StoredGame(game_id, keys, inline)
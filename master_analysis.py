@@ -1,48 +1,63 @@
+import argparse
 import glob
 import os
 import time
 import importlib
-from concurrent.futures import ProcessPoolExecutor, as_completed
-import matplotlib
-
-from config import OUTPUT_DIR, SUBDIRS, USE_SINGLE_CORE
-
-from game_etl import process_single_file
-
-from studies import (
-    s0_metadata_analysis,
-    s1_summary_analysis,
-    s2_health_analysis,
-    s3_winrate_analysis,
-    s4_spatial_analysis,
-    s5_sequence_analysis,
-    s6_velocity_analysis,
-    s7_survival_analysis,
-    s8_trueskill_analysis,
-    s9_archetype_analysis,
-    s10_performance_analysis
-)
-
-STUDY_MODULES = [
-    s0_metadata_analysis,
-    s1_summary_analysis,
-    s2_health_analysis,
-    s3_winrate_analysis,
-    s4_spatial_analysis,
-    s5_sequence_analysis,
-    s6_velocity_analysis,
-    s7_survival_analysis,
-    s8_trueskill_analysis,
-    s9_archetype_analysis,
-    s10_performance_analysis
-]
+from itertools import islice
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from config import (OUTPUT_DIR, SUBDIRS, N_WORKERS, MAX_TASKS_PER_CHILD, CHUNKS_PER_WORKER, START_METHOD,
+                    USE_INTERMEDIATE_STORE, PROFILE)
+
+from game_etl import process_single_file, process_chunk, plan_chunks, init_worker
+from study_registry import STUDIES, select_studies, required_extracts, analysis_modules
+from extract_ledger import load_ledger, save_ledger, game_fingerprint, stored_game, record
+from profiler import Profiler, phase, write_report
 
 def setup_directories():
     for sd in SUBDIRS:
         os.makedirs(os.path.join(OUTPUT_DIR, sd), exist_ok=True)
     #print(f"created output directories in {OUTPUT_DIR}/")
 
-def run_study_wrapper(module_name, data):
+def make_pool(n_workers, initializer=None, start_method=START_METHOD):
+    if MAX_TASKS_PER_CHILD is not None and start_method == 'fork':
+        # ProcessPoolExecutor cannot replace forked workers
+        raise ValueError("MAX_TASKS_PER_CHILD needs START_METHOD 'spawn', 'forkserver' or None, not 'fork'")
+    kwargs = {'max_workers': n_workers, 'initializer': initializer}
+    if start_method is not None:
+        kwargs['mp_context'] = multiprocessing.get_context(start_method)
+    if MAX_TASKS_PER_CHILD is not None:
+        kwargs['max_tasks_per_child'] = MAX_TASKS_PER_CHILD
+    return ProcessPoolExecutor(**kwargs)
+
+def completed_in_flight(pool, n_workers, jobs):
+    # submits (fn, *args) jobs in order with at most n_workers in flight and yields each
+    # (future, job) as it finishes. Bounding the queue also keeps max_tasks_per_child from stalling
+    # the pool (an executor with a backlog does not replace workers that retire).
+    jobs = iter(jobs)
+    running = {}
+    while True:
+        for job in islice(jobs, n_workers - len(running)):
+            try:
+                future = pool.submit(*job)
+            except BrokenProcessPool as e:
+                # a dead pool fails the remaining jobs instead of ending the iteration
+                future = Future()
+                future.set_exception(e)
+            running[future] = job
+        if not running:
+            return
+        future = next(as_completed(running))
+        yield future, running.pop(future)
+
+def has_partials(module):
+    # analysis modules exposing init/update/merge/finalize can fold games in as they are extracted
+    return all(hasattr(module, fn) for fn in ('init', 'update', 'merge', 'finalize'))
+
+def run_study_wrapper(module_name, data, from_state=False, profile=False):
+    profiler = Profiler() if profile else None
     try:
         import matplotlib
         matplotlib.use('Agg')
@@ -51,18 +66,35 @@ def run_study_wrapper(module_name, data):
         
         name = module_name.split('.')[-1]
         start = time.perf_counter()
-        module.run(data)
+        with phase(profiler, 'analysis', name):
+            if from_state:
+                module.finalize(data)
+            else:
+                module.run(data)
         duration = time.perf_counter() - start
-        return f"✔ {name} completed in {duration:.2f}s"
+        message = f"✔ {name} completed in {duration:.2f}s"
     except Exception as e:
         import traceback
         traceback.print_exc()
-        return f"✘ {module_name} FAILED: {e}"
+        message = f"✘ {module_name} FAILED: {e}"
+    return message, (profiler.finish() if profiler is not None else [])
 
-def main(data_folder="."):
+def main(data_folder=".", studies=None, incremental=False, workers=None, profile=None):
     total_start_time = time.perf_counter()
+    n_workers = workers or N_WORKERS or os.cpu_count() or 1
+    profile = PROFILE if profile is None else profile
+    profiler = Profiler() if profile else None
     setup_directories()
 
+    studies = select_studies(studies)
+    extract_keys = required_extracts(studies)
+    selected = analysis_modules(studies)
+    # analysis modules import their plotting/modelling libraries inside finalize, so loading
+    # them here (and in every spawned worker that re-imports this file) stays cheap
+    study_modules = [importlib.import_module(name) for name in selected]
+    streaming_modules = [mod for mod in study_modules if has_partials(mod)]
+    batch_modules = [mod for mod in study_modules if not has_partials(mod)]
+
     print(f"1) discovering game files in '{data_folder}'")
     
     json_files = glob.glob(os.path.join(data_folder, "Match_*.json")) 
@@ -87,60 +119,156 @@ def main(data_folder="."):
             continue
 
     #print(f"found {len(tasks)} valid games to process.")
+    print(f"  studies: {', '.join(studies)} (extracts: {', '.join(extract_keys)})")
+
+    # the ledger follows every run that writes to the intermediate store; with --incremental,
+    # unchanged games it lists are read back from the store instead of being extracted again
+    reused = {}
+    fingerprints = {}
+    ledger = None
+    if incremental and not USE_INTERMEDIATE_STORE:
+        print("  incremental mode needs USE_INTERMEDIATE_STORE, extracting every game")
+    elif USE_INTERMEDIATE_STORE:
+        ledger = load_ledger()
+        for i, task in enumerate(tasks):
+            fingerprints[task[0]] = game_fingerprint(task)
+            if not incremental:
+                continue
+            handle = stored_game(ledger, task[0], fingerprints[task[0]], extract_keys)
+            if handle is not None:
+                reused[i] = handle
+        if incremental:
+            print(f"  incremental: {len(reused)} unchanged games reused, {len(tasks) - len(reused)} to extract")
+    to_extract = [i for i in range(len(tasks)) if i not in reused]
 
     # 2) data extraction
-    print(f"\n2) starting extraction ({'SINGLE' if USE_SINGLE_CORE else 'MULTI'}-CORE)")
+    print(f"\n2) starting extraction ({n_workers} worker{'s' if n_workers > 1 else ''})")
     extract_start = time.perf_counter()
     extracted_data = []
+    load_stats = []
+    n_games = 0
+
+    states = {mod.__name__: mod.init() for mod in streaming_modules}
+    failed = {}
+
+    def fold(i, res):
+        # games are folded in task order so order-dependent outputs do not depend on scheduling
+        nonlocal n_games
+        if ledger is not None and i not in reused:
+            game_id = tasks[i][0]
+            if res:
+                record(ledger, game_id, fingerprints[game_id], res)
+            else:
+                ledger.pop(game_id, None)
+        if not res:
+            return
+        n_games += 1
+        if 'load_stats' in res:
+            load_stats.append(res['load_stats'])
+        if profiler is not None and 'profile' in res:
+            profiler.records.extend(res['profile'])
+        for mod in streaming_modules:
+            if mod.__name__ in failed:
+                continue
+            try:
+                with phase(profiler, 'fold', mod.__name__.split('.')[-1]):
+                    mod.update(states[mod.__name__], res)
+            except Exception as e:
+                failed[mod.__name__] = e
+        if batch_modules:
+            extracted_data.append(res)
 
-    if USE_SINGLE_CORE:
+    if n_workers == 1:
+        done = 0
         for i, task in enumerate(tasks):
+            if i in reused:
+                fold(i, reused[i])
+                continue
+            res = None
             try:
-                res = process_single_file(task)
-                if res:
-                    extracted_data.append(res)
-                if (i + 1) % 10 == 0:
-                    print(f"  extracted {i + 1}/{len(tasks)}")
+                res = process_single_file(task, extract_keys, profile)
             except Exception as e:
                 print(f"  failed {task[0]}: {e}")
+            fold(i, res)
+            done += 1
+            if done % 10 == 0:
+                print(f"  extracted {done}/{len(to_extract)}")
     else:
-        with ProcessPoolExecutor() as pool:
-            results = pool.map(process_single_file, tasks)
-            for i, res in enumerate(results):
-                if res:
-                    extracted_data.append(res)
-                if (i + 1) % 10 == 0:
-                    print(f"  extracted {i + 1}/{len(tasks)}")
+        chunks = plan_chunks(tasks, to_extract, n_workers * CHUNKS_PER_WORKER)
+        with make_pool(n_workers, init_worker) as pool:
+            jobs = ((process_chunk, [(i, tasks[i]) for i in chunk], extract_keys, profile) for chunk in chunks)
+            completed = completed_in_flight(pool, n_workers, jobs)
+            pending = dict(reused)
+            next_index = 0
+            done = 0
+            while next_index < len(tasks):
+                if next_index not in pending:
+                    future, (_, chunk, *_) = next(completed)
+                    try:
+                        results = future.result()
+                    except Exception as e:
+                        for i, task in chunk:
+                            print(f"  failed {task[0]}: {e}")
+                        results = [(i, None) for i, _ in chunk]
+                    for i, res in results:
+                        pending[i] = res
+                    previous = done
+                    done += len(results)
+                    if done // 10 > previous // 10:
+                        print(f"  extracted {done}/{len(to_extract)}")
+                    continue
+                fold(next_index, pending.pop(next_index))
+                next_index += 1
+
+    if ledger is not None:
+        save_ledger(ledger)
 
     extract_duration = time.perf_counter() - extract_start
-    print(f"  extraction complete ({len(extracted_data)}/{len(tasks)} games)")
+    print(f"  extraction complete ({n_games}/{len(tasks)} games)")
     print(f"  Time: {extract_duration/60:.2f}m")
 
-    if not extracted_data:
+    if load_stats:
+        total_mb = sum(s['bytes'] for s in load_stats) / (1024 * 1024)
+        total_sec = sum(s['seconds'] for s in load_stats)
+        throughput = total_mb / total_sec if total_sec > 0 else 0
+        print(f"  json load: {total_mb:.1f} MB in {total_sec:.2f}s ({throughput:.1f} MB/s)")
+
+    if not n_games:
         print("no data extracted")
         return
 
+    for name, e in failed.items():
+        print(f"  error folding games into {name}: {e}")
+
     # 2) output/analysis
-    print(f"\n3) starting analysis ({'SINGLE' if USE_SINGLE_CORE else 'MULTI'}-CORE) ---")
+    print(f"\n3) starting analysis ({n_workers} worker{'s' if n_workers > 1 else ''}) ---")
     analysis_start = time.perf_counter()
 
-    if USE_SINGLE_CORE:
-        for mod in STUDY_MODULES:
-            try:
-                print(f"running {mod.__name__}...")
-                mod.run(extracted_data)
-            except Exception as e:
-                print(f"error in {mod.__name__}: {e}")
+    jobs = []
+    for mod in study_modules:
+        if mod.__name__ in failed:
+            continue
+        if mod in streaming_modules:
+            jobs.append((run_study_wrapper, mod.__name__, states[mod.__name__], True, profile))
+        else:
+            jobs.append((run_study_wrapper, mod.__name__, extracted_data, False, profile))
+
+    def report(result):
+        result_msg, records = result
+        print(f"  {result_msg}")
+        if profiler is not None:
+            profiler.records.extend(records)
+
+    if n_workers == 1:
+        for fn, *args in jobs:
+            report(fn(*args))
     else:
-        with ProcessPoolExecutor() as pool:
-            futures = {
-                pool.submit(run_study_wrapper, mod.__name__, extracted_data): mod.__name__
-                for mod in STUDY_MODULES
-            }
-            
-            for future in as_completed(futures):
-                result_msg = future.result()
-                print(f"  {result_msg}")
+        with make_pool(n_workers) as pool:
+            for future, (_, module_name, *_) in completed_in_flight(pool, n_workers, jobs):
+                try:
+                    report(future.result())
+                except Exception as e:
+                    report((f"✘ {module_name} FAILED: {e}", []))
 
     analysis_duration = time.perf_counter() - analysis_start
     total_duration = time.perf_counter() - total_start_time
@@ -153,7 +281,31 @@ def main(data_folder="."):
     print(f" total runtime:   {int(total_duration // 60)}m {int(total_duration % 60)}s")
     print(f" output location: {os.path.abspath(OUTPUT_DIR)}")
 
+    if profiler is not None:
+        profiler.add('pipeline', 'extraction', extract_duration)
+        profiler.add('pipeline', 'analysis', analysis_duration)
+        profiler.add('pipeline', 'total', total_duration)
+        write_report(profiler.finish())
+
 if __name__ == "__main__":
-    matplotlib.use('Agg') 
-    
-    main(data_folder="match_data")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Astro match data pipeline")
+    parser.add_argument("--data", default="match_data", help="folder containing the Match/PlayerUpdate/Performance files")
+    parser.add_argument("--studies", default=None,
+                        help=f"comma separated studies to run, e.g. s3,s7 (default: all of {','.join(STUDIES.keys())})")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: N_WORKERS in config.py, else every core; 1 runs in-process)")
+    parser.add_argument("--profile", action="store_true", default=None,
+                        help="record time and memory per game phase, study extract and analysis module to results/data/profile_*")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only extract games that are new or changed since the last run, reuse the stored extracts of the rest")
+    args = parser.parse_args()
+
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    try:
+        selected_studies = select_studies(args.studies)
+    except ValueError as e:
+        parser.error(str(e))
+
+    main(data_folder=args.data, studies=selected_studies, incremental=args.incremental, workers=args.workers, profile=args.profile)
\ No newline at end of file
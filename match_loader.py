@@ -0,0 +1,195 @@
+import codecs
+import json
+import os
+import time
+
+CHUNK_SIZE = 1 << 16
+WHITESPACE = ' \t\n\r'
+
+_decoder = json.JSONDecoder()
+
+
+def detect_encoding(head):
+    # match exports are either plain utf-8 (optionally with a BOM) or utf-16 with a BOM
+    if head.startswith(codecs.BOM_UTF8):
+        return 'utf-8', len(codecs.BOM_UTF8)
+    if head.startswith(codecs.BOM_UTF16_LE):
+        return 'utf-16-le', len(codecs.BOM_UTF16_LE)
+    if head.startswith(codecs.BOM_UTF16_BE):
+        return 'utf-16-be', len(codecs.BOM_UTF16_BE)
+    if len(head) > 1 and head[1] == 0:
+        return 'utf-16-le', 0
+    return 'utf-8', 0
+
+
+class MatchReader:
+    def __init__(self, path, chunk_size=CHUNK_SIZE):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.header = {}
+        self.has_events = False
+        self.bytes_read = 0
+        self.repairs = 0
+
+        self._file = open(path, 'rb')
+        head = self._file.read(4)
+        self.bytes_read = len(head)
+        self.encoding, bom_len = detect_encoding(head)
+        self._text = codecs.getincrementaldecoder(self.encoding)()
+        self.buf = self._text.decode(head[bom_len:])
+        self.pos = 0
+        self.eof = False
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _fill(self):
+        if self.eof:
+            return False
+        chunk = self._file.read(self.chunk_size)
+        self.bytes_read += len(chunk)
+        if not chunk:
+            self.eof = True
+            tail = self._text.decode(b'', final=True)
+        else:
+            tail = self._text.decode(chunk)
+        # drop everything already consumed so only the current value stays in memory
+        self.buf = self.buf[self.pos:] + tail
+        self.pos = 0
+        return True
+
+    def _peek(self):
+        while True:
+            buf, pos = self.buf, self.pos
+            while pos < len(buf) and buf[pos] in WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self._fill():
+                return ''
+
+    def _next_significant(self, i):
+        buf = self.buf
+        while i < len(buf) and buf[i] in WHITESPACE:
+            i += 1
+        return i
+
+    def _repair(self, err_pos):
+        buf = self.buf
+        if err_pos >= len(buf):
+            return False
+        ch = buf[err_pos]
+
+        # "12." -> "12.0"
+        if ch == '.' and err_pos > self.pos and buf[err_pos - 1].isdigit():
+            nxt = self._next_significant(err_pos + 1)
+            if nxt < len(buf) and buf[nxt] in ',]}':
+                self.buf = buf[:err_pos + 1] + '0' + buf[err_pos + 1:]
+                self.repairs += 1
+                return True
+            return False
+
+        # "[1, 2, ]" / "{"a": 1, }" -> the decoder stops on the closing bracket (or on the comma in newer pythons)
+        if ch == ',':
+            nxt = self._next_significant(err_pos + 1)
+            if nxt < len(buf) and buf[nxt] in ']}':
+                self.buf = buf[:err_pos] + buf[err_pos + 1:]
+                self.repairs += 1
+                return True
+        elif ch in ']}':
+            prev = err_pos - 1
+            while prev > self.pos and buf[prev] in WHITESPACE:
+                prev -= 1
+            if prev > self.pos and buf[prev] == ',':
+                self.buf = buf[:prev] + buf[prev + 1:]
+                self.repairs += 1
+                return True
+        return False
+
+    def read_value(self):
+        if not self._peek():
+            raise ValueError(f"unexpected end of file in {self.path}")
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                if self._repair(e.pos) or self._fill():
+                    continue
+                raise
+            # a scalar that runs into the end of the buffer may continue in the next chunk
+            if end >= len(self.buf) and self._fill():
+                continue
+            # bare scalars stop decoding right before a trailing dot instead of raising
+            if self.buf[end:end + 1] == '.' and (self._repair(end) or self._fill()):
+                continue
+            self.pos = end
+            return value
+
+    def _expect(self, ch):
+        if self._peek() != ch:
+            raise ValueError(f"expected '{ch}' in {self.path}")
+        self.pos += 1
+
+    def _iter_container(self, close):
+        while True:
+            ch = self._peek()
+            if ch == close:
+                self.pos += 1
+                return
+            if ch == ',':
+                # tolerates trailing commas at the streamed levels as well
+                self.pos += 1
+                continue
+            if not ch:
+                raise ValueError(f"unterminated container in {self.path}")
+            yield
+
+    def iter_events(self):
+        # walks the top level object by hand and hands out the events array one element at a time,
+        # everything else lands in self.header
+        if not self._peek():
+            return
+        self._expect('{')
+        for _ in self._iter_container('}'):
+            key = self.read_value()
+            self._expect(':')
+            if key == 'events' and self._peek() == '[':
+                self.pos += 1
+                self.has_events = True
+                for _ in self._iter_container(']'):
+                    yield self.read_value()
+            else:
+                self.header[key] = self.read_value()
+
+    def stats(self, seconds):
+        mb = self.bytes_read / (1024 * 1024)
+        return {
+            'path': self.path,
+            'encoding': self.encoding,
+            'bytes': self.bytes_read,
+            'seconds': seconds,
+            'mb_per_s': mb / seconds if seconds > 0 else 0.0,
+            'repairs': self.repairs
+        }
+
+
+def load_match(path):
+    start = time.perf_counter()
+    with MatchReader(path) as reader:
+        try:
+            events = list(reader.iter_events())
+            data = reader.header
+            if reader.has_events:
+                data['events'] = events
+        except ValueError as e:
+            print(f"error parsing {os.path.basename(path)}: {e}")
+            data = {}
+        stats = reader.stats(time.perf_counter() - start)
+    return data, stats
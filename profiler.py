@@ -0,0 +1,106 @@
+import csv
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+from config import OUTPUT_DIR, PROFILE_TOP_N
+
+FIELDS = ['game_id', 'stage', 'name', 'wall_s', 'cpu_s', 'peak_mb']
+
+
+class Profiler:
+    # Wall time, CPU time and peak traced heap growth (tracemalloc) of named phases.
+    # Phases can nest; an outer phase's peak includes the peaks of the phases inside it.
+
+    def __init__(self, game_id=None):
+        self.game_id = game_id
+        self.records = []
+        self._peaks = []
+        self._owns_tracing = not tracemalloc.is_tracing()
+        if self._owns_tracing:
+            tracemalloc.start()
+
+    @contextmanager
+    def phase(self, stage, name):
+        current, peak = tracemalloc.get_traced_memory()
+        if self._peaks:
+            self._peaks[-1] = max(self._peaks[-1], peak)
+        tracemalloc.reset_peak()
+        self._peaks.append(current)
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            peak = max(self._peaks.pop(), tracemalloc.get_traced_memory()[1])
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], peak)
+            tracemalloc.reset_peak()
+
+            self.records.append({
+                'game_id': self.game_id,
+                'stage': stage,
+                'name': name,
+                'wall_s': wall,
+                'cpu_s': cpu,
+                'peak_mb': max(0, peak - current) / (1024 * 1024)
+            })
+
+    def add(self, stage, name, wall_s, cpu_s=0.0, peak_mb=0.0):
+        self.records.append({'game_id': self.game_id, 'stage': stage, 'name': name,
+                             'wall_s': wall_s, 'cpu_s': cpu_s, 'peak_mb': peak_mb})
+
+    def finish(self):
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+        return self.records
+
+
+def phase(profiler, stage, name):
+    if profiler is None:
+        return nullcontext()
+    return profiler.phase(stage, name)
+
+
+def summarize(records):
+    summary = {}
+    for r in records:
+        key = f"{r['stage']}:{r['name']}"
+        if key not in summary:
+            summary[key] = {'stage': r['stage'], 'name': r['name'], 'calls': 0,
+                            'wall_s': 0.0, 'cpu_s': 0.0, 'max_wall_s': 0.0, 'peak_mb': 0.0}
+        s = summary[key]
+        s['calls'] += 1
+        s['wall_s'] += r['wall_s']
+        s['cpu_s'] += r['cpu_s']
+        s['max_wall_s'] = max(s['max_wall_s'], r['wall_s'])
+        s['peak_mb'] = max(s['peak_mb'], r['peak_mb'])
+    return sorted(summary.values(), key=lambda s: s['wall_s'], reverse=True)
+
+
+def write_report(records, top_n=PROFILE_TOP_N):
+    csv_path = os.path.join(OUTPUT_DIR, "data", "profile_records.csv")
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(records)
+
+    summary = summarize(records)
+    json_path = os.path.join(OUTPUT_DIR, "data", "profile_summary.json")
+    with open(json_path, 'w') as f:
+        json.dump(summary, f, indent=1)
+
+    # pipeline totals overlap everything below them, leave them out of the hotspots
+    hotspots = [s for s in summary if s['stage'] != 'pipeline'][:top_n]
+    print(f"\n top {len(hotspots)} hotspots (summed over games, wall time)")
+    print(f" {'stage:name':<36}{'calls':>7}{'wall s':>10}{'cpu s':>10}{'max s':>9}{'peak MB':>10}")
+    for s in hotspots:
+        label = f"{s['stage']}:{s['name']}"
+        print(f" {label:<36}{s['calls']:>7}{s['wall_s']:>10.2f}{s['cpu_s']:>10.2f}{s['max_wall_s']:>9.2f}{s['peak_mb']:>10.1f}")
+    print(f" profile written to {csv_path} and {json_path}")
@@ -0,0 +1,90 @@
+from functools import lru_cache
+
+import numpy as np
+
+MEMO_SIZE = 4096
+
+
+class SessionIndex:
+    # id_history compiled into per-id start/end/user arrays.
+    # Segments of one id never overlap (a new join closes the previous segment), so starts and
+    # ends are both non-decreasing and "first segment containing t" is a single binary search.
+
+    def __init__(self, id_history):
+        self.segments = {}
+        self.starts = {}
+        self.ends = {}
+        self.users = {}
+        self.linear = {}
+
+        for raw_id, segments in id_history.items():
+            if not segments:
+                continue
+            self.segments[raw_id] = segments
+            starts = np.array([seg['start'] for seg in segments])
+            ends = np.array([seg['end'] for seg in segments])
+            self.starts[raw_id] = starts
+            self.ends[raw_id] = ends
+            self.users[raw_id] = np.array([seg['user'] for seg in segments], dtype=object)
+            if np.any(np.diff(starts) < 0) or np.any(np.diff(ends) < 0):
+                # out of order history, keep the first-match scan for this id
+                self.linear[raw_id] = segments
+
+        self.segment_at = lru_cache(maxsize=MEMO_SIZE)(self._segment_at)
+
+    def __contains__(self, raw_id):
+        return raw_id in self.starts
+
+    def _segment_at(self, raw_id, timestamp):
+        # index of the first segment with start <= timestamp <= end, else the last segment
+        if raw_id in self.linear:
+            for i, seg in enumerate(self.linear[raw_id]):
+                if seg['start'] <= timestamp <= seg['end']:
+                    return i
+            return len(self.linear[raw_id]) - 1
+
+        ends = self.ends[raw_id]
+        i = int(np.searchsorted(ends, timestamp, side='left'))
+        if i < len(ends) and self.starts[raw_id][i] <= timestamp:
+            return i
+        return len(ends) - 1
+
+    def _segments_at(self, raw_id, timestamps):
+        if raw_id in self.linear:
+            return np.array([self._segment_at(raw_id, t) for t in timestamps.tolist()], dtype=np.int64)
+
+        ends = self.ends[raw_id]
+        last = len(ends) - 1
+        idx = np.searchsorted(ends, timestamps, side='left')
+        clipped = np.minimum(idx, last)
+        found = (idx <= last) & (self.starts[raw_id][clipped] <= timestamps)
+        return np.where(found, clipped, last)
+
+    def user_at(self, raw_id, timestamp):
+        if raw_id not in self.starts:
+            return f"Unknown_{raw_id}"
+        return self.segments[raw_id][self.segment_at(raw_id, timestamp)]['user']
+
+    def start_at(self, raw_id, timestamp):
+        if raw_id not in self.starts:
+            return 0
+        return self.segments[raw_id][self.segment_at(raw_id, timestamp)]['start']
+
+    def _batch(self, raw_ids, timestamps, table, missing):
+        raw_ids = np.asarray(raw_ids, dtype=object)
+        timestamps = np.asarray(timestamps)
+        out = np.empty(len(raw_ids), dtype=object)
+
+        for raw_id in set(raw_ids.tolist()):
+            mask = raw_ids == raw_id
+            if raw_id not in self.starts:
+                out[mask] = missing(raw_id)
+                continue
+            out[mask] = table[raw_id][self._segments_at(raw_id, timestamps[mask])]
+        return out
+
+    def users_at(self, raw_ids, timestamps):
+        return self._batch(raw_ids, timestamps, self.users, lambda raw_id: f"Unknown_{raw_id}")
+
+    def starts_at(self, raw_ids, timestamps):
+        return self._batch(raw_ids, timestamps, self.starts, lambda raw_id: 0)
@@ -0,0 +1,76 @@
+import hashlib
+import os
+import pickle
+
+import config
+from config import CACHE_DIR
+
+CACHED_ATTRS = ['id_history', 'username_map', 'spawn_index', 'weapon_timeline', 'fights']
+
+# any edit to the code that builds the state, or to the config values it reads, invalidates the cache
+VERSION_SOURCES = [
+    'game_etl_core.py', 'fight_engine.py', 'match_loader.py', 'export_csv.py',
+    'telemetry_index.py', 'session_index.py', 'weapon_index.py'
+]
+VERSION_CONFIG = ['STAMPS_PER_SECOND', 'STAMPS_THRESHOLD', 'DEFAULT_HEALTH']
+
+
+def hash_file(path, h):
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+
+
+def code_version(sources, config_names=()):
+    h = hashlib.sha1()
+    root = os.path.dirname(os.path.abspath(__file__))
+    for name in sources:
+        hash_file(os.path.join(root, name), h)
+    h.update(repr([(name, getattr(config, name)) for name in config_names]).encode())
+    return h.hexdigest()
+
+
+def core_version():
+    return code_version(VERSION_SOURCES, VERSION_CONFIG)
+
+
+_CORE_VERSION = None
+
+
+def state_key(json_path, update_path):
+    global _CORE_VERSION
+    if _CORE_VERSION is None:
+        _CORE_VERSION = core_version()
+
+    h = hashlib.sha1(_CORE_VERSION.encode())
+    for path in (json_path, update_path):
+        hash_file(path, h)
+    return h.hexdigest()
+
+
+def cache_path(game_id):
+    return os.path.join(CACHE_DIR, f"state_{game_id}.pkl")
+
+
+def load_state(game_id, key):
+    path = cache_path(game_id)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            entry = pickle.load(f)
+    except Exception as e:
+        print(f"ignoring unreadable cache {path}: {e}")
+        return None
+    if entry.get('key') != key:
+        return None
+    return entry['state']
+
+
+def save_state(game_id, key, state):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = cache_path(game_id)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump({'key': key, 'state': state}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
@@ -1,23 +1,40 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-from collections import defaultdict
 import os
 from config import OUTPUT_DIR
 
+def init():
+    return {'mode_counts': {}, 'total_games': 0}
+
+def update(state, d):
+    state['total_games'] += 1
+    if 'S0' in d:
+        mode = d['S0'].get('mode', 'Unknown')
+        state['mode_counts'][mode] = state['mode_counts'].get(mode, 0) + 1
+    return state
+
+def merge(state, other):
+    state['total_games'] += other['total_games']
+    for mode, count in other['mode_counts'].items():
+        state['mode_counts'][mode] = state['mode_counts'].get(mode, 0) + count
+    return state
+
 def run(data):
-    mode_counts = defaultdict(int)
-    
+    state = init()
     for d in data:
-        if 'S0' in d:
-            mode = d['S0'].get('mode', 'Unknown')
-            mode_counts[mode] += 1
+        update(state, d)
+    finalize(state)
+
+def finalize(state):
+    import matplotlib.pyplot as plt
+
+    mode_counts = state['mode_counts']
     
     df_modes = pd.DataFrame({
         'Game_Mode': list(mode_counts.keys()),
         'Games_Played': list(mode_counts.values())
     }).sort_values('Games_Played', ascending=False).reset_index(drop=True)
     
-    total_games = len(data)
+    total_games = state['total_games']
     if total_games > 0:
         df_modes['Percentage'] = (df_modes['Games_Played'] / total_games * 100).round(2)
         df_modes['Percentage'] = df_modes['Percentage'].astype(str) + '%'
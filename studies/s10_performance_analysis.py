@@ -1,25 +1,43 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from collections import defaultdict
-from scipy.stats import gamma
 import os
 from config import OUTPUT_DIR
 
-def run(data):    
-    player_perf_history = defaultdict(lambda: {'latencies': [], 'fps_values': []})
-    
+def init():
+    return {'player_perf_history': {}}
+
+def update(state, d):
+    s10_perf = d['S10'].get('performance', {})
+    for user, stats in s10_perf.items():
+        latencies_list = stats.get('all_latencies', 0)
+        fps = stats.get('avg_fps', 0)
+        
+        history = state['player_perf_history'].setdefault(user, {'latencies': [], 'fps_values': []})
+        if latencies_list:
+            history['latencies'].extend(latencies_list)
+        if fps > 0:
+            history['fps_values'].append(fps)
+    return state
+
+def merge(state, other):
+    for user, other_history in other['player_perf_history'].items():
+        history = state['player_perf_history'].setdefault(user, {'latencies': [], 'fps_values': []})
+        history['latencies'].extend(other_history['latencies'])
+        history['fps_values'].extend(other_history['fps_values'])
+    return state
+
+def run(data):
+    state = init()
     for d in data:
-        s10_perf = d['S10'].get('performance', {})
-        for user, stats in s10_perf.items():
-            latencies_list = stats.get('all_latencies', 0)
-            fps = stats.get('avg_fps', 0)
-            
-            if latencies_list:
-                player_perf_history[user]['latencies'].extend(latencies_list)
-            if fps > 0:
-                player_perf_history[user]['fps_values'].append(fps)
+        update(state, d)
+    finalize(state)
+
+def finalize(state):    
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    from scipy.stats import gamma
+
+    player_perf_history = state['player_perf_history']
 
     all_latencies = []
     all_fps = []
@@ -13,12 +13,9 @@ def extract(processor):
                         break
             
             if raw_id_u1 is not None:
-                 row = processor.df_update[
-                    (processor.df_update['PlayerId'] == raw_id_u1) & 
-                    (abs(processor.df_update['Stamp'] - f['start_stamp']) < 200)
-                 ]
-                 if not row.empty:
-                     loc = [row.iloc[0]['Location.X'], row.iloc[0]['Location.Y'], row.iloc[0]['Location.Z']]
+                 row = processor.telemetry.first_within(raw_id_u1, f['start_stamp'], 200)
+                 if row is not None:
+                     loc = processor.telemetry.vector('location', row).tolist()
                      s11_fight_starts.append({
                          'loc': loc,
                          'item': f['items'][0] if f['items'] else 'Default'
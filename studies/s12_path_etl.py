@@ -7,13 +7,9 @@ def extract(processor):
         for seg in segments:
             user = seg['user']
             
-            session_df = processor.df_update[
-                (processor.df_update['PlayerId'] == raw_id) & 
-                (processor.df_update['Stamp'] >= seg['start']) & 
-                (processor.df_update['Stamp'] <= seg['end'])
-            ]
+            session_rows = processor.telemetry.window(raw_id, seg['start'], seg['end'])
             
-            if session_df.empty: continue
+            if session_rows.stop == session_rows.start: continue
             
             user_spawns = [t for t in processor.spawn_index.get(raw_id, []) 
                            if seg['start'] <= t <= seg['end']]
@@ -21,14 +17,11 @@ def extract(processor):
             for i, spawn_t in enumerate(user_spawns):
                 next_t = user_spawns[i+1] if i + 1 < len(user_spawns) else seg['end']
                 
-                path_slice = session_df[
-                    (session_df['Stamp'] >= spawn_t) & 
-                    (session_df['Stamp'] < next_t)
-                ]
+                path_rows = processor.telemetry.window(raw_id, spawn_t, next_t, closed=False)
                 
-                if not path_slice.empty:
-                    resampled = path_slice.iloc[::int(STAMPS_PER_SECOND / 4)]
-                    coords = resampled[['Location.X', 'Location.Y', 'Location.Z']].values.tolist()
+                if path_rows.stop > path_rows.start:
+                    resampled = processor.telemetry.vector('location', path_rows)[::int(STAMPS_PER_SECOND / 4)]
+                    coords = resampled.tolist()
                     if coords:
                         s4_paths.append({'user': user, 'path': coords})
                         
@@ -1,5 +1,2 @@
 def extract(processor):
-    s14_idle_times = []
-    for f in processor.fights:
-        s14_idle_times.extend(list(f['idle_pre'].values()))
-    return s14_idle_times
\ No newline at end of file
+    return list(processor.metric('idle_times'))
\ No newline at end of file
@@ -1,32 +1,58 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import squarify
-import matplotlib.cm
-import matplotlib.colors
-from collections import defaultdict
 import os
 from config import OUTPUT_DIR
 
-def run(data):    
-    s1_items = defaultdict(lambda: defaultdict(int))
-    s1_player_totals = defaultdict(lambda: {'kills':0, 'deaths':0, 'playtime':0, 'wins':0, 'games':0})
-    s1_settings = []
+def init():
+    return {'player_totals': {}, 'items': {}, 'settings': []}
+
+def update(state, d):
+    s1 = d['S1']
+    for user, stats in s1['players'].items():
+        totals = state['player_totals'].setdefault(user, {'kills':0, 'deaths':0, 'playtime':0, 'wins':0, 'games':0})
+        totals['kills'] += stats['kills']
+        totals['deaths'] += stats['deaths']
+        totals['playtime'] += stats['playtime']
+        totals['wins'] += stats['won']
+        totals['games'] += 1
+    
+    for item, metrics in s1['items'].items():
+        item_totals = state['items'].setdefault(item, {})
+        for k, v in metrics.items():
+            item_totals[k] = item_totals.get(k, 0) + v
+    
+    state['settings'].extend(s1['settings'])
+    return state
+
+def merge(state, other):
+    for user, stats in other['player_totals'].items():
+        totals = state['player_totals'].setdefault(user, {'kills':0, 'deaths':0, 'playtime':0, 'wins':0, 'games':0})
+        for k, v in stats.items():
+            totals[k] += v
+    
+    for item, metrics in other['items'].items():
+        item_totals = state['items'].setdefault(item, {})
+        for k, v in metrics.items():
+            item_totals[k] = item_totals.get(k, 0) + v
     
+    state['settings'].extend(other['settings'])
+    return state
+
+def run(data):
+    state = init()
     for d in data:
-        s1 = d['S1']
-        for user, stats in s1['players'].items():
-            s1_player_totals[user]['kills'] += stats['kills']
-            s1_player_totals[user]['deaths'] += stats['deaths']
-            s1_player_totals[user]['playtime'] += stats['playtime']
-            s1_player_totals[user]['wins'] += stats['won']
-            s1_player_totals[user]['games'] += 1
-        
-        for item, metrics in s1['items'].items():
-            for k, v in metrics.items():
-                s1_items[item][k] += v
-        
-        s1_settings.extend(s1['settings'])
+        update(state, d)
+    finalize(state)
+
+def finalize(state):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    import squarify
+    import matplotlib.cm
+    import matplotlib.colors
+
+    s1_items = state['items']
+    s1_player_totals = state['player_totals']
+    s1_settings = state['settings']
 
     df_players = pd.DataFrame.from_dict(s1_player_totals, orient='index').reset_index()
     df_players.rename(columns={'index':'Username'}, inplace=True)
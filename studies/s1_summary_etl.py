@@ -13,15 +13,6 @@ def extract(processor):
         'winning_team_id': winning_team
     }
 
-    user_teams = {} 
-    for e in processor.events:
-        if e.get('name') == 'set_team':
-            raw_id = e.get('player')
-            team_id = e.get('team')
-            t = e.get('stamp')
-            u = processor.resolve_user(raw_id, t)
-            user_teams[u] = team_id
-
     s1_settings = []
     device_profiles = processor.json_data.get('DeviceProfiles', [])
     for profile in device_profiles:
@@ -33,48 +24,7 @@ def extract(processor):
             'fps_cap': profile.get('Settings', {}).get('FrameRateLimit') 
         })
 
-    s1_players = {}
-    all_users = set(processor.username_map.keys())
-
-    for user in all_users:
-        raw_ids = processor.username_map[user]
-        
-        did_win = 0
-        if winning_team is not None:
-            if user_teams.get(user, -1) == winning_team:
-                did_win = 1
-        elif raw_winner:
-            if user == raw_winner:
-                did_win = 1
-            elif isinstance(raw_winner, int):
-                 if processor.resolve_user(raw_winner, s1_meta['duration']) == user:
-                     did_win = 1
-        
-        kills = 0
-        deaths = 0
-        for e in processor.events:
-            if e.get('name') == 'elim':
-                if processor.resolve_user(e.get('instigator'), e.get('stamp')) == user:
-                    if e.get('instigator') != e.get('target'):
-                        kills += 1
-                if processor.resolve_user(e.get('target'), e.get('stamp')) == user:
-                    deaths += 1
-        
-        playtime_sec = 0
-        for raw_id in raw_ids:
-            if raw_id in processor.id_history:
-                for seg in processor.id_history[raw_id]:
-                    if seg['user'] == user:
-                        end = min(seg['end'], processor.events[-1].get('stamp', 0))
-                        playtime_sec += (end - seg['start']) / STAMPS_PER_SECOND
-
-        s1_players[user] = {
-            'kills': kills,
-            'deaths': deaths,
-            'playtime': playtime_sec,
-            'won': did_win,
-            'team': user_teams.get(user, -1)
-        }
+    s1_players = processor.metric('player_stats')
 
     s1_items = {} 
     def get_item_entry(name):
@@ -83,6 +33,17 @@ def extract(processor):
         return s1_items[name]
 
     first_pick_tracked = set()
+
+    kill_elims = [
+        e for e in processor.events
+        if e.get('name') == 'elim' and e.get('instigator') is not None and e.get('target') is not None
+        and e.get('instigator') != e.get('target')
+    ]
+    elim_stamps = [e.get('stamp') for e in kill_elims]
+    held_items = zip(
+        processor.get_weapons_at_times([e.get('instigator') for e in kill_elims], elim_stamps),
+        processor.get_weapons_at_times([e.get('target') for e in kill_elims], elim_stamps)
+    )
     
     for e in processor.events:
         t = e.get('stamp')
@@ -106,58 +67,45 @@ def extract(processor):
                     get_item_entry(final_blow_item)['suicides'] += 1
                 else:
                     get_item_entry(final_blow_item)['kills_final'] += 1
-                    held_item_k = processor.get_weapon_at_time(instigator_id, t)
+                    held_item_k, held_item_d = next(held_items)
                     get_item_entry(held_item_k)['kills_held'] += 1
-                    held_item_d = processor.get_weapon_at_time(target_id, t)
                     get_item_entry(held_item_d)['deaths_held'] += 1
 
-    timeline_by_pid = {}
-    for entry in processor.weapon_timeline:
-        pid = entry['pid']
-        if pid not in timeline_by_pid: timeline_by_pid[pid] = []
-        timeline_by_pid[pid].append(entry)
+    last_stamp = processor.events[-1].get('stamp') if processor.events else 0
+    weapon_items = processor.weapons.items
+    for pid in processor.weapons.player_ids():
+        stamps, codes = processor.weapons.hold_spans(pid)
         
-    for pid, entries in timeline_by_pid.items():
-        for i in range(len(entries)):
-            current = entries[i]
-            start_t = current['time']
-            item = current['item']
-            
-            if i < len(entries) - 1:
-                end_t = entries[i+1]['time']
-            else:
-                session_end = processor.events[-1].get('stamp')
-                if pid in processor.id_history:
-                    for seg in processor.id_history[pid]:
-                        if seg['start'] <= start_t <= seg['end']:
-                            session_end = seg['end']
-                            break
-                end_t = min(session_end, processor.events[-1].get('stamp'))
-
-            duration_sec = max(0, (end_t - start_t) / STAMPS_PER_SECOND)
-            get_item_entry(item)['time_held'] += duration_sec
+        last_start = stamps[-1]
+        session_end = last_stamp
+        if pid in processor.id_history:
+            for seg in processor.id_history[pid]:
+                if seg['start'] <= last_start <= seg['end']:
+                    session_end = seg['end']
+                    break
+
+        # every equip is held until the next one, the last one until the session (or match) ends
+        ends = np.append(stamps[1:], min(session_end, last_stamp))
+        durations = np.maximum(0, (ends - stamps) / STAMPS_PER_SECOND)
+        held_by_code = np.bincount(codes, weights=durations, minlength=len(weapon_items))
+        for code in np.unique(codes):
+            get_item_entry(weapon_items[code])['time_held'] += float(held_by_code[code])
 
     s1_dist = {'roll_angles': [], 'speeds': [], 'kill_speeds': [], 'lifespans': []}
     
-    if not processor.df_update.empty:
-        sample = processor.df_update.iloc[::CSV_SAMPLE_COUNT]
-        if 'Rotation.Roll' in sample.columns:
-            s1_dist['roll_angles'] = sample['Rotation.Roll'].tolist()
-        if 'Velocity.X' in sample.columns:
-            vels = sample[['Velocity.X', 'Velocity.Y', 'Velocity.Z']].values
-            speeds = np.linalg.norm(vels, axis=1)
-            s1_dist['speeds'] = speeds.tolist()
+    telemetry_cols = processor.telemetry.columns
+    if 'Rotation.Roll' in telemetry_cols:
+        s1_dist['roll_angles'] = telemetry_cols['Rotation.Roll'][::CSV_SAMPLE_COUNT].tolist()
+    if processor.telemetry.has_vector('velocity'):
+        s1_dist['speeds'] = processor.metric('speeds')[::CSV_SAMPLE_COUNT].tolist()
 
     for e in processor.events:
         if e.get('name') == 'elim':
             killer_id = e.get('instigator')
             t = e.get('stamp')
-            row = processor.df_update[
-                (processor.df_update['PlayerId'] == killer_id) & 
-                (abs(processor.df_update['Stamp'] - t) < STAMPS_THRESHOLD)
-            ]
-            if not row.empty:
-                v = row.iloc[0][['Velocity.X', 'Velocity.Y', 'Velocity.Z']].values
+            row = processor.telemetry.first_within(killer_id, t, STAMPS_THRESHOLD)
+            if row is not None:
+                v = processor.telemetry.vector('velocity', row)
                 speed = np.linalg.norm(v)
                 s1_dist['kill_speeds'].append(speed)
 
@@ -178,26 +126,7 @@ def extract(processor):
     kill_fights = [f for f in processor.fights if f['winner'] is not None]
     s1_fight_stats = {'durations': [f['duration'] for f in kill_fights]}
 
-    s1_perf = {} 
-    for username, df in processor.perf_dfs.items():
-        if df is None or df.empty: continue
-        
-        p_stats = {
-            'gpu_bound_frames': 0, 'nettick_bound_frames': 0, 'gt_bound_frames': 0,
-            'total_frames': len(df), 'avg_latency': 0, 'avg_fps': 0
-        }
-        if 'GPU Bound' in df.columns: p_stats['gpu_bound_frames'] = int(df['GPU Bound'].sum())
-        if 'GT Bound' in df.columns: p_stats['gt_bound_frames'] = int(df['GT Bound'].sum())
-        if 'NTT Bound' in df.columns: p_stats['nettick_bound_frames'] = int(df['NTT Bound'].sum())
-        
-        if 'Packet Latency' in df.columns:
-            p_stats['avg_latency'] = float(df['Packet Latency'].mean())
-            p_stats['all_latencies'] = df['Packet Latency'].astype(float).tolist()
-        if 'Frame Avg' in df.columns:
-            avg_frame_ms = df['Frame Avg'].mean()
-            p_stats['avg_fps'] = 1000.0 / avg_frame_ms if avg_frame_ms > 0 else 0
-
-        s1_perf[username] = p_stats
+    s1_perf = processor.metric('perf_summaries')
 
     return {
         'meta': s1_meta,
@@ -1,62 +1,91 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import random
 import os
-from config import OUTPUT_DIR
+from config import (OUTPUT_DIR, HEALTH_SIMULATIONS_PER_START, HEALTH_BOOTSTRAP_REPLICATES,
+                    HEALTH_BOOTSTRAP_SIMULATIONS, HEALTH_SEED)
 
-def run(data):    
-    INITIAL_HEALTH_REGEN_WAIT = 5.0
-    ACTIVE_HEALTH_REGEN_WAIT = 2.0
-    MAX_HEALTH = 10
-    N_SIMULATIONS_PER_START = 500
+INITIAL_HEALTH_REGEN_WAIT = 5.0
+ACTIVE_HEALTH_REGEN_WAIT = 2.0
+MAX_HEALTH = 10
+# samples per start health drawn in one pass of simulate_transitions (bounds memory)
+SIMULATION_BATCH = 100_000
 
-    all_dmg = []
-    all_idle = []
-    for d in data:
-        all_dmg.extend(d['S2']['damage_values'])
-        all_idle.extend(d['S2']['idle_values'])
+def init():
+    return {'damage_values': [], 'idle_values': []}
 
-    if not all_dmg or not all_idle:
-        #no fight/idle data found
-        return
+def update(state, d):
+    state['damage_values'].extend(d['S2']['damage_values'])
+    state['idle_values'].extend(d['S2']['idle_values'])
+    return state
 
-    transition_counts = np.zeros((MAX_HEALTH + 1, MAX_HEALTH + 1))
+def merge(state, other):
+    state['damage_values'].extend(other['damage_values'])
+    state['idle_values'].extend(other['idle_values'])
+    return state
 
-    def simulate_next_health(start_health, damage_taken, idle_time):
-        if damage_taken >= start_health:
-            return MAX_HEALTH 
-        
-        health_after_fight = max(0, start_health - damage_taken)
-        
-        remaining_time = idle_time
-        
-        if remaining_time <= INITIAL_HEALTH_REGEN_WAIT:
-            return health_after_fight
-        
-        remaining_time -= INITIAL_HEALTH_REGEN_WAIT
-        
-        regen_ticks = int(remaining_time // ACTIVE_HEALTH_REGEN_WAIT)
-        final_health = health_after_fight + regen_ticks
-        
-        return min(final_health, MAX_HEALTH)
+def run(data):
+    state = init()
+    for d in data:
+        update(state, d)
+    finalize(state)
 
-    for start_h in range(MAX_HEALTH + 1):
-        for _ in range(N_SIMULATIONS_PER_START):
-            dmg = random.choice(all_dmg)
-            idle = random.choice(all_idle)
-            next_h = int(simulate_next_health(start_h, dmg, idle))
-            transition_counts[start_h, next_h] += 1
+def next_health(start_health, damage_taken, idle_time):
+    # health at the start of the next fight: death respawns at full health, otherwise regen starts
+    # INITIAL_HEALTH_REGEN_WAIT seconds after the fight and adds 1 hp every ACTIVE_HEALTH_REGEN_WAIT
+    health_after_fight = np.maximum(0, start_health - damage_taken)
+    regen_ticks = np.floor((idle_time - INITIAL_HEALTH_REGEN_WAIT) / ACTIVE_HEALTH_REGEN_WAIT)
+    healed = np.where(idle_time <= INITIAL_HEALTH_REGEN_WAIT, health_after_fight,
+                      np.minimum(health_after_fight + regen_ticks, MAX_HEALTH))
+    return np.where(damage_taken >= start_health, MAX_HEALTH, healed).astype(np.int64)
 
-    row_sums = transition_counts.sum(axis=1, keepdims=True)
-    row_sums[row_sums == 0] = 1 
-    transition_matrix = transition_counts / row_sums
+def simulate_transitions(rng, all_dmg, all_idle, n_per_start):
+    # Monte Carlo estimate: every start health is paired with n_per_start (damage, idle) draws
+    n_states = MAX_HEALTH + 1
+    starts = np.arange(n_states)[:, None]
+    counts = np.zeros(n_states * n_states)
+    for done in range(0, n_per_start, SIMULATION_BATCH):
+        size = min(SIMULATION_BATCH, n_per_start - done)
+        dmg = all_dmg[rng.integers(len(all_dmg), size=(n_states, size))]
+        idle = all_idle[rng.integers(len(all_idle), size=(n_states, size))]
+        cells = starts * n_states + next_health(starts, dmg, idle)
+        counts += np.bincount(cells.ravel(), minlength=n_states * n_states)
 
-    eigenvalues, eigenvectors = np.linalg.eig(transition_matrix.T)
+    counts = counts.reshape(n_states, n_states)
+    row_sums = counts.sum(axis=1, keepdims=True)
+    row_sums[row_sums == 0] = 1
+    return counts / row_sums
+
+def stationary_distribution(matrix):
+    eigenvalues, eigenvectors = np.linalg.eig(matrix.T)
     stationary_idx = np.argmin(np.abs(eigenvalues - 1.0))
     stationary = np.real(eigenvectors[:, stationary_idx])
-    stationary = stationary / stationary.sum()
+    return stationary / stationary.sum()
+
+def finalize(state):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    all_dmg = state['damage_values']
+    all_idle = state['idle_values']
+
+    if not all_dmg or not all_idle:
+        #no fight/idle data found
+        return
+
+    rng = np.random.default_rng(HEALTH_SEED)
+    dmg_values = np.asarray(all_dmg, dtype=float)
+    idle_values = np.asarray(all_idle, dtype=float)
+
+    transition_matrix = simulate_transitions(rng, dmg_values, idle_values, HEALTH_SIMULATIONS_PER_START)
+    stationary = stationary_distribution(transition_matrix)
+
+    # bootstrap: resample the observed damage/idle values, re-simulate, keep each stationary distribution
+    boot = np.empty((HEALTH_BOOTSTRAP_REPLICATES, MAX_HEALTH + 1))
+    for b in range(HEALTH_BOOTSTRAP_REPLICATES):
+        dmg_sample = dmg_values[rng.integers(len(dmg_values), size=len(dmg_values))]
+        idle_sample = idle_values[rng.integers(len(idle_values), size=len(idle_values))]
+        boot[b] = stationary_distribution(simulate_transitions(rng, dmg_sample, idle_sample, HEALTH_BOOTSTRAP_SIMULATIONS))
+    ci_lower, ci_upper = np.percentile(boot, [2.5, 97.5], axis=0)
 
     df_trans = pd.DataFrame(
         transition_matrix,
@@ -67,7 +96,9 @@ def run(data):
 
     df_stationary = pd.DataFrame({
         'Health': list(range(MAX_HEALTH + 1)),
-        'Probability': stationary
+        'Probability': stationary,
+        'CI_Lower': ci_lower,
+        'CI_Upper': ci_upper
     })
     df_stationary.to_csv(os.path.join(OUTPUT_DIR, "data", "s2_stationary_distribution.csv"), index=False)
     
@@ -79,9 +110,10 @@ def run(data):
     df_paired.to_csv(os.path.join(OUTPUT_DIR, "data", "s2_source_data.csv"), index=False)
 
     plt.figure(figsize=(10, 6))
-    plt.bar(df_stationary['Health'], df_stationary['Probability'], 
+    yerr = [np.maximum(0, stationary - ci_lower), np.maximum(0, ci_upper - stationary)]
+    plt.bar(df_stationary['Health'], df_stationary['Probability'], yerr=yerr, capsize=4,
             color='teal', edgecolor='black', alpha=0.8)
-    plt.title(f"Stationary Health Distribution (Stable State)\n"
+    plt.title(f"Stationary Health Distribution (Stable State, 95% bootstrap CI)\n"
               f"Wait={INITIAL_HEALTH_REGEN_WAIT}s, Regen={ACTIVE_HEALTH_REGEN_WAIT}s/hp")
     plt.xlabel("Health at Start of Fight")
     plt.ylabel("Probability")
@@ -6,8 +6,7 @@ def extract(processor):
     
     for f in processor.fights:
         s2_data['damage_values'].append(f['damage_total'])
-        
-        for idle_val in f['idle_pre'].values():
-            s2_data['idle_values'].append(idle_val)
+
+    s2_data['idle_values'] = list(processor.metric('idle_times'))
             
     return s2_data
\ No newline at end of file
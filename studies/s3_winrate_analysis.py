@@ -1,16 +1,39 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import statsmodels.api as sm
-import statsmodels.formula.api as smf
 import os
-from config import OUTPUT_DIR
+from config import OUTPUT_DIR, S3_GROUPED_GLM, S3_DIST_BIN
+
+def init():
+    return {'rows': []}
+
+def update(state, d):
+    if 'S3' in d:
+        state['rows'].extend(d['S3'])
+    return state
+
+def merge(state, other):
+    state['rows'].extend(other['rows'])
+    return state
 
 def run(data):
-    all_s3 = []
-    for d in data: 
-        if 'S3' in d:
-            all_s3.extend(d['S3'])
+    state = init()
+    for d in data:
+        update(state, d)
+    finalize(state)
+
+def grouped_rows(df, dist_bin=S3_DIST_BIN):
+    # one row per item x start_dist bin (at its centre) x start_health x win, weights summed; with
+    # frequency weights this is the per-row likelihood with start_dist rounded to its bin
+    df = df.assign(start_dist=(np.floor(df['start_dist'] / dist_bin) + 0.5) * dist_bin)
+    keys = ['item_used', 'start_dist', 'start_health', 'win']
+    return df.groupby(keys, dropna=False, observed=True)['attribution_weight'].sum().reset_index()
+
+def finalize(state):
+    import matplotlib.pyplot as plt
+    import statsmodels.api as sm
+    import statsmodels.formula.api as smf
+
+    all_s3 = state['rows']
             
     df_glmm = pd.DataFrame(all_s3)
     
@@ -18,8 +41,6 @@ def run(data):
         df_glmm.to_csv(os.path.join(OUTPUT_DIR, "data", "s3_glmm_input.csv"), index=False)
         
         try:
-            df_glmm['start_dist_scaled'] = df_glmm['start_dist'] / 1000.0
-            
             item_counts = df_glmm['item_used'].value_counts()
             valid_items = item_counts[item_counts >= 5].index
             df_clean = df_glmm[df_glmm['item_used'].isin(valid_items)].copy()
@@ -28,6 +49,10 @@ def run(data):
                 # not enough data after filtering
                 return
 
+            if S3_GROUPED_GLM:
+                df_clean = grouped_rows(df_clean)
+            df_clean['start_dist_scaled'] = df_clean['start_dist'] / 1000.0
+
             mod = smf.glm(
                 "win ~ C(item_used) + start_dist_scaled + start_health", 
                 data=df_clean, 
@@ -1,87 +1,120 @@
 import pandas as pd
 import numpy as np
 import os
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.cluster import MiniBatchKMeans, AgglomerativeClustering
-from config import OUTPUT_DIR
+import traceback
+from config import OUTPUT_DIR, VOXEL_SIZE, DENSITY_GRID_SIZE
+
+# voxel cells closer than this (average linkage) are merged into one cluster. With no k-means
+# pre-coarsening this gives more, smaller clusters than the old n/5 micro-cluster pass
+MERGE_DIST = 300.0
+
+def init():
+    return {'rows': []}
+
+def update(state, d):
+    if 'S4' in d:
+        state['rows'].extend(d['S4'])
+    return state
+
+def merge(state, other):
+    state['rows'].extend(other['rows'])
+    return state
 
 def run(data):
-    all_deaths = []
+    state = init()
     for d in data:
-        if 'S4' in d:
-            all_deaths.extend(d['S4'])
+        update(state, d)
+    finalize(state)
+
+def voxelize(coords, voxel_size=VOXEL_SIZE):
+    # deaths collapsed into the occupied voxel cells: the centroid of each cell's deaths and their count
+    cells = np.floor(coords / voxel_size).astype(np.int64)
+    _, inverse, counts = np.unique(cells, axis=0, return_inverse=True, return_counts=True)
+    inverse = inverse.ravel()
+    centers = np.column_stack([np.bincount(inverse, weights=coords[:, i]) for i in range(3)]) / counts[:, None]
+    return centers, counts
+
+def cluster_map(coords):
+    from sklearn.cluster import AgglomerativeClustering
+
+    centers, weights = voxelize(coords)
+    if len(centers) > 1:
+        agg = AgglomerativeClustering(
+            n_clusters=None, 
+            distance_threshold=MERGE_DIST, 
+            linkage='average',
+            metric='euclidean'
+        )
+        labels = agg.fit_predict(centers)
+    else:
+        labels = np.zeros(len(centers), dtype=np.int64)
+
+    # count-weighted centroid of every cluster
+    total_weight = np.bincount(labels, weights=weights)
+    xyz = [np.bincount(labels, weights=centers[:, i] * weights) / total_weight for i in range(3)]
+    return pd.DataFrame({'x': xyz[0], 'y': xyz[1], 'z': xyz[2], 'count': total_weight.astype(int)})
+
+def density_grid(x, y, bins=DENSITY_GRID_SIZE, cut=3):
+    # Gaussian KDE of the deaths on a fixed bins x bins grid: the points are binned and the
+    # histogram is convolved with the kernel by FFT, so the cost does not grow with the death count.
+    # Bandwidth per axis is Scott's rule (std * n^(-1/6)); the grid reaches cut bandwidths past the data
+    from scipy.signal import fftconvolve
+
+    n = len(x)
+    bw = np.array([np.std(x), np.std(y)]) * n ** (-1 / 6)
+    bw[bw == 0] = 1.0
+    xmin, xmax = x.min() - cut * bw[0], x.max() + cut * bw[0]
+    ymin, ymax = y.min() - cut * bw[1], y.max() + cut * bw[1]
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins, range=[[xmin, xmax], [ymin, ymax]])
+
+    cell = np.array([x_edges[1] - x_edges[0], y_edges[1] - y_edges[0]])
+    sigma = bw / cell
+    kx = np.arange(-np.ceil(cut * sigma[0]), np.ceil(cut * sigma[0]) + 1)
+    ky = np.arange(-np.ceil(cut * sigma[1]), np.ceil(cut * sigma[1]) + 1)
+    kernel = np.outer(np.exp(-0.5 * (kx / sigma[0]) ** 2), np.exp(-0.5 * (ky / sigma[1]) ** 2))
+    kernel /= kernel.sum()
+
+    density = np.maximum(fftconvolve(counts, kernel, mode='same'), 0) / (n * cell[0] * cell[1])
+    # rows are y so the grid reads like an image; extent as for imshow(origin='lower')
+    return density.T, (xmin, xmax, ymin, ymax)
+
+def iso_levels(density, thresh=0.05, n_levels=10):
+    # density values enclosing thresh..1 of the probability mass (seaborn's kdeplot levels)
+    values = np.sort(density.ravel())[::-1]
+    mass = np.cumsum(values) / values.sum()
+    idx = np.searchsorted(mass, 1 - np.linspace(thresh, 1, n_levels))
+    return np.unique(np.take(values, idx, mode='clip'))
+
+def finalize(state):
+    import matplotlib.pyplot as plt
+
+    all_deaths = state['rows']
     
     if all_deaths:
         df_deaths = pd.DataFrame(all_deaths)
         os.makedirs(f"{OUTPUT_DIR}/spatial", exist_ok=True)
         df_deaths.to_csv(f"{OUTPUT_DIR}/spatial/s5_deaths_raw.csv", index=False)
 
-        for map_name in df_deaths['map'].unique():            
-            map_data = df_deaths[df_deaths['map'] == map_name].copy()
-            coords = map_data[['x', 'y', 'z']].values
-            
+        for map_name in df_deaths['map'].unique():
+            coords = df_deaths.loc[df_deaths['map'] == map_name, ['x', 'y', 'z']].values.astype(float)
             if len(coords) < 10:
                 continue
 
             try:
-                n_micro_clusters = max(1, int(len(coords) / 5))
-                
-                init_size = max(3 * n_micro_clusters, 100)
-                if init_size > len(coords): init_size = len(coords)
-
-                kmeans = MiniBatchKMeans(
-                    n_clusters=n_micro_clusters, 
-                    batch_size=256, 
-                    random_state=42, 
-                    n_init=3,
-                    init_size=init_size
-                )
-                kmeans.fit(coords)
-                
-                micro_centers = kmeans.cluster_centers_ 
-                
-                unique_labels, counts = np.unique(kmeans.labels_, return_counts=True)
-                weight_map = dict(zip(unique_labels, counts))
-                
-                micro_weights = np.array([weight_map.get(i, 0) for i in range(len(micro_centers))])
-                
-                df_micro = pd.DataFrame(micro_centers, columns=['x', 'y', 'z'])
-                df_micro['weight'] = micro_weights
-                
-                df_micro = df_micro[df_micro['weight'] > 0].copy().reset_index(drop=True)
-                
-                MERGE_DIST = 300.0 
-                
-                agg = AgglomerativeClustering(
-                    n_clusters=None, 
-                    distance_threshold=MERGE_DIST, 
-                    linkage='average',
-                    metric='euclidean'
-                )
-                
-                agg_labels = agg.fit_predict(df_micro[['x', 'y', 'z']].values)
-                
-                df_micro['label'] = agg_labels
-                
-                final_clusters = []
-                
-                for label, group in df_micro.groupby('label'):
-                    total_weight = group['weight'].sum()
-                    
-                    avg_x = np.average(group['x'], weights=group['weight'])
-                    avg_y = np.average(group['y'], weights=group['weight'])
-                    avg_z = np.average(group['z'], weights=group['weight'])
-                    
-                    final_clusters.append({'x': avg_x, 'y': avg_y, 'z': avg_z, 'count': int(total_weight)})
-                
-                df_final = pd.DataFrame(final_clusters)
-                
+                df_final = cluster_map(coords)
                 cluster_filename = f"{OUTPUT_DIR}/spatial/s5_clusters_{map_name}.csv"
                 df_final.to_csv(cluster_filename, index=False)
 
+                density, extent = density_grid(coords[:, 0], coords[:, 1])
+                np.save(f"{OUTPUT_DIR}/graphs/s5_heatmap_{map_name}.npy", density)
+                np.save(f"{OUTPUT_DIR}/graphs/s5_heatmap_{map_name}_extent.npy", np.array(extent))
+
+                xs = np.linspace(extent[0], extent[1], density.shape[1])
+                ys = np.linspace(extent[2], extent[3], density.shape[0])
                 plt.figure(figsize=(10,10))
-                sns.kdeplot(x=map_data['x'], y=map_data['y'], cmap="inferno", fill=True, thresh=0.05, alpha=0.8)
+                plt.contourf(xs, ys, density, levels=iso_levels(density), cmap="inferno", alpha=0.8, extend='max')
+                plt.xlabel("x")
+                plt.ylabel("y")
                 plt.title(f"s5: Death Density Top-Down ({map_name})")
                 plt.axis('equal')
                 plt.savefig(f"{OUTPUT_DIR}/graphs/s5_heatmap_{map_name}.png")
@@ -89,7 +122,6 @@ def run(data):
 
             except Exception as e:
                 print(f"clustering failed for {map_name}: {e}")
-                import traceback
                 traceback.print_exc()
     else:
         print("skipping s5 (no death locations or missing sklearn libraries)")
@@ -11,12 +11,9 @@ def extract(processor):
             loc = e.get('location') 
             
             if not loc:
-                row = processor.df_update[
-                    (processor.df_update['PlayerId'] == target_id) & 
-                    (abs(processor.df_update['Stamp'] - t) < 100)
-                ]
-                if not row.empty:
-                    loc = [row.iloc[0]['Location.X'], row.iloc[0]['Location.Y'], row.iloc[0]['Location.Z']]
+                row = processor.telemetry.first_within(target_id, t, 100)
+                if row is not None:
+                    loc = processor.telemetry.vector('location', row).tolist()
             
             if loc:
                 s5_deaths.append({
@@ -1,23 +1,15 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from collections import defaultdict
 import os
 from config import OUTPUT_DIR
 
-def run(data):
-    all_S5 = []
-    for d in data: 
-        if 'S5' in d:
-            all_S5.extend(d['S5'])
-    
-    ngram_counts_kill = defaultdict(int)
-    ngram_counts_death = defaultdict(int)
-    
-    total_kills = 0
-    total_deaths = 0
+def init():
+    return {'ngram_counts_kill': {}, 'ngram_counts_death': {}, 'total_kills': 0, 'total_deaths': 0}
+
+def update(state, d):
+    if 'S5' not in d:
+        return state
     
-    for entry in all_S5:
+    for entry in d['S5']:
         outcome = entry['result']
         seq = entry['sequence']
         
@@ -25,14 +17,41 @@ def run(data):
             continue
         
         if outcome == 'kill':
-            total_kills += 1
-            for i in range(len(seq)-1):
-                ngram_counts_kill[f"{seq[i]} -> {seq[i+1]}"] += 1
-                
+            state['total_kills'] += 1
+            counts = state['ngram_counts_kill']
         elif outcome == 'death':
-            total_deaths += 1
-            for i in range(len(seq)-1):
-                ngram_counts_death[f"{seq[i]} -> {seq[i+1]}"] += 1
+            state['total_deaths'] += 1
+            counts = state['ngram_counts_death']
+        else:
+            continue
+        
+        for i in range(len(seq)-1):
+            pattern = f"{seq[i]} -> {seq[i+1]}"
+            counts[pattern] = counts.get(pattern, 0) + 1
+    return state
+
+def merge(state, other):
+    state['total_kills'] += other['total_kills']
+    state['total_deaths'] += other['total_deaths']
+    for key in ('ngram_counts_kill', 'ngram_counts_death'):
+        for pattern, count in other[key].items():
+            state[key][pattern] = state[key].get(pattern, 0) + count
+    return state
+
+def run(data):
+    state = init()
+    for d in data:
+        update(state, d)
+    finalize(state)
+
+def finalize(state):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    ngram_counts_kill = state['ngram_counts_kill']
+    ngram_counts_death = state['ngram_counts_death']
+    total_kills = state['total_kills']
+    total_deaths = state['total_deaths']
 
     rows = []
     
@@ -3,7 +3,7 @@ from config import STAMPS_PER_SECOND
 
 def extract(processor):
     s6_sequences = []
-    has_velocity = 'Velocity.X' in processor.df_update.columns
+    has_velocity = processor.telemetry.has_vector('velocity')
 
     for e in processor.events:
         if e.get('name') == 'elim':
@@ -24,20 +24,14 @@ def extract(processor):
                 outcome = sub['outcome']
                 
                 seq_events = [
-                    ev.get('name') for ev in processor.events 
-                    if ev.get('player') == pid 
-                    and start_seq <= ev.get('stamp') <= t 
-                    and ev.get('name') in ['surface_lock', 'push_off', 'dash', 'kick']
+                    ev.get('name') for ev in processor.event_index.query(pid=pid, start=start_seq, end=t)
+                    if ev.get('name') in ['surface_lock', 'push_off', 'dash', 'kick']
                 ]
                 
-                w_df = processor.df_update[
-                    (processor.df_update['PlayerId'] == pid) & 
-                    (processor.df_update['Stamp'] >= start_seq) & 
-                    (processor.df_update['Stamp'] <= t)
-                ]
+                w_rows = processor.telemetry.window(pid, start_seq, t)
                 
-                if not w_df.empty and has_velocity:
-                    vels = w_df[['Velocity.X', 'Velocity.Y', 'Velocity.Z']].values
+                if w_rows.stop > w_rows.start and has_velocity:
+                    vels = processor.telemetry.vector('velocity', w_rows)
                     speeds = np.linalg.norm(vels, axis=1)
                     if np.max(speeds) > 1500: seq_events.append("high_velocity")
                 
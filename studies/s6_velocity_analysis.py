@@ -1,72 +1,117 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import statsmodels.api as sm
 import warnings
 import os
-from config import OUTPUT_DIR
+from config import OUTPUT_DIR, VELOCITY_WINDOW_S, VELOCITY_GRID_STEPS
+
+# per game (n_subjects, n_steps) speed grids and outcomes, concatenated once in finalize
+def init():
+    return {'speeds': [], 'outcome': []}
+
+def update(state, d):
+    if 'S6' in d:
+        state['speeds'].append(d['S6']['speeds'])
+        state['outcome'].append(d['S6']['outcome'])
+    return state
+
+def merge(state, other):
+    state['speeds'].extend(other['speeds'])
+    state['outcome'].extend(other['outcome'])
+    return state
 
 def run(data):
-    all_S6 = []
-    for d in data: 
-        if 'S6' in d: all_S6.extend(d['S6'])
-    
-    if all_S6:
-        max_len = max(len(x['curve']) for x in all_S6)
-        time_axis = np.linspace(-max_len / 2.0, 0, max_len)
-
-        kills_data = [x['curve'] for x in all_S6 if x['result'] == 'kill']
-        deaths_data = [x['curve'] for x in all_S6 if x['result'] == 'death']
-        
-        def get_curve_stats(curves, target_len):
-            if not curves: 
-                return np.full(target_len, np.nan), np.full(target_len, np.nan)
-            
-            mat = np.full((len(curves), target_len), np.nan)
-            
-            for i, c in enumerate(curves):
-                segment = c[-target_len:] 
-                mat[i, -len(segment):] = segment
-            
+    state = init()
+    for d in data:
+        update(state, d)
+    finalize(state)
+
+def batched_logit(X, y, min_rows=20, maxiter=35, tol=1e-8):
+    # Logit(y ~ 1 + X[:, t]) for every column t at once by Newton/IRLS, each column on its non-NaN
+    # rows, with statsmodels' newton start (zeros), step and stopping rule (every |step| <= tol,
+    # at most maxiter steps). Columns with min_rows rows or fewer, no variance or one outcome class
+    # are NaN, as are fits that do not converge (perfect separation) or whose Hessian goes singular.
+    # Returns params and standard errors, both (n_cols, 2) as [const, slope]
+    from scipy.special import expit
+
+    mask = ~np.isnan(X.T)
+    x = np.where(mask, X.T, 0.0)
+    w = mask.astype(float)
+    y = y.astype(float)
+
+    n = w.sum(axis=1)
+    n_pos = w @ y
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        spread = np.nanstd(X, axis=0)
+    valid = (n > min_rows) & (spread > 0) & (n_pos > 0) & (n_pos < n)
+
+    wy = w * y
+
+    def newton_terms(beta, cols):
+        # gradient and Hessian entries of the log-likelihood for the columns in cols
+        xa, wa = x[cols], w[cols]
+        wp = wa * expit(beta[:, :1] + beta[:, 1:] * xa)
+        r = wy[cols] - wp
+        v = wp - wp * wp  # w is 0/1, so this is w * p * (1 - p)
+        vx = v * xa
+        return (r.sum(axis=1), np.einsum('ij,ij->i', r, xa),
+                v.sum(axis=1), vx.sum(axis=1), np.einsum('ij,ij->i', vx, xa))
+
+    beta = np.zeros((X.shape[1], 2))
+    active = np.flatnonzero(valid)
+    for _ in range(maxiter):
+        if not len(active):
+            break
+        g0, g1, h00, h01, h11 = newton_terms(beta[active], active)
+        det = h00 * h11 - h01 * h01
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = np.column_stack([(h11 * g0 - h01 * g1) / det, (h00 * g1 - h01 * g0) / det])
+        beta[active] += step
+        # converged columns drop out; singular ones (non-finite step) stop here and are NaN below
+        active = active[np.any(np.abs(step) > tol, axis=1)]
+    # still moving after maxiter: no maximum (e.g. perfect separation)
+    valid[active] = False
+
+    beta[~valid] = np.nan
+    bse = np.full_like(beta, np.nan)
+    fitted = np.flatnonzero(valid & np.all(np.isfinite(beta), axis=1))
+    if len(fitted):
+        _, _, h00, h01, h11 = newton_terms(beta[fitted], fitted)
+        det = h00 * h11 - h01 * h01
+        with np.errstate(divide='ignore', invalid='ignore'):
+            bse[fitted] = np.sqrt(np.column_stack([h11 / det, h00 / det]))
+    beta[~np.all(np.isfinite(bse), axis=1)] = np.nan
+    return beta, bse
+
+def finalize(state):
+    import matplotlib.pyplot as plt
+
+    n_subjects = sum(len(o) for o in state['outcome'])
+
+    if n_subjects:
+        time_axis = np.linspace(-VELOCITY_WINDOW_S, 0, VELOCITY_GRID_STEPS)
+        X_full = np.concatenate(state['speeds']).astype(float)
+        y_full = np.concatenate(state['outcome'])
+
+        def get_curve_stats(mat):
             with warnings.catch_warnings():
                 warnings.simplefilter("ignore", category=RuntimeWarning)
                 mu = np.nanmean(mat, axis=0)
                 sigma = np.nanstd(mat, axis=0)
-                
             return mu, sigma
 
-        mean_kill, std_kill = get_curve_stats(kills_data, max_len)
-        mean_death, std_death = get_curve_stats(deaths_data, max_len)
-        
-        coeffs = []
-        
-        X_full = np.full((len(all_S6), max_len), np.nan)
-        y_full = np.array([1 if x['result'] == 'kill' else 0 for x in all_S6])
-        
-        for i, entry in enumerate(all_S6):
-            c = entry['curve']
-            X_full[i, -len(c):] = c[-max_len:]
-
-        for t in range(max_len):
-            col = X_full[:, t]
-            mask = ~np.isnan(col)
-            X_t = col[mask]
-            y_t = y_full[mask]
-            
-            if len(X_t) > 20 and np.std(X_t) > 0 and len(np.unique(y_t)) > 1:
-                try:
-                    model = sm.Logit(y_t, sm.add_constant(X_t)).fit(disp=0)
-                    coeffs.append(model.params[1])
-                except:
-                    coeffs.append(np.nan)
-            else:
-                coeffs.append(np.nan)
+        mean_kill, std_kill = get_curve_stats(X_full[y_full == 1])
+        mean_death, std_death = get_curve_stats(X_full[y_full == 0])
+
+        params, bse = batched_logit(X_full, y_full)
+        coeffs = params[:, 1]
 
         df_curve = pd.DataFrame({
             'Time_Before_Event': time_axis,
             'Mean_Velocity_Killer': mean_kill,
             'Mean_Velocity_Victim': mean_death,
-            'Logit_Coefficient': coeffs
+            'Logit_Coefficient': coeffs,
+            'Logit_SE': bse[:, 1]
         })
         df_curve.to_csv(os.path.join(OUTPUT_DIR, "data", "s6_velocity_curve.csv"), index=False)
         
@@ -1,43 +1,59 @@
 import numpy as np
-from config import STAMPS_PER_SECOND
+from config import STAMPS_PER_SECOND, VELOCITY_WINDOW_S, VELOCITY_GRID_STEPS, VELOCITY_MAX_GAP_S
 
-def extract(processor):
-    s7_curves = []
-    
-    has_velocity = 'Velocity.X' in processor.df_update.columns
-    if not has_velocity:
-        return []
+# seconds relative to the elim stamp of each grid column
+GRID_OFFSETS = np.linspace(-VELOCITY_WINDOW_S, 0.0, VELOCITY_GRID_STEPS)
+
+def resample(stamps, values, query, max_gap):
+    # values at the query stamps: linear between the samples either side when those are at most
+    # max_gap apart, else the nearest sample if it is within max_gap / 2, else NaN
+    out = np.full(query.shape, np.nan, dtype=np.float32)
+    if not len(stamps):
+        return out
+    i = np.searchsorted(stamps, query, side='right')
+    li = np.maximum(i - 1, 0)
+    ri = np.minimum(i, len(stamps) - 1)
+    has_left = i > 0
+    has_right = i < len(stamps)
+    left, right = stamps[li], stamps[ri]
+
+    inside = has_left & has_right & (right - left <= max_gap)
+    out[inside] = np.interp(query[inside], stamps, values)
+
+    nearest = np.where(has_left & (~has_right | (query - left <= right - query)), li, ri)
+    hold = ~inside & (np.abs(query - stamps[nearest]) <= max_gap / 2)
+    out[hold] = values[nearest[hold]]
+    return out
 
+def extract(processor):
+    # every elim's killer (outcome 1) and victim (outcome 0), speed resampled onto GRID_OFFSETS
+    telemetry = processor.telemetry
+    pids, stamps, outcome = [], [], []
     for e in processor.events:
         if e.get('name') == 'elim':
             t = e.get('stamp')
-            
             instigator_id = e.get('instigator')
             target_id = e.get('target')
-            
-            subjects = []
-            if instigator_id and instigator_id != target_id:
-                subjects.append({'pid': instigator_id, 'outcome': 'kill'})
-            if target_id:
-                subjects.append({'pid': target_id, 'outcome': 'death'})
-            
-            start_curve = t - (5 * STAMPS_PER_SECOND)
-            
-            for sub in subjects:
-                pid = sub['pid']
-                outcome = sub['outcome']
-                
-                w_df = processor.df_update[
-                    (processor.df_update['PlayerId'] == pid) & 
-                    (processor.df_update['Stamp'] >= start_curve) & 
-                    (processor.df_update['Stamp'] <= t)
-                ]
-                
-                if not w_df.empty:
-                    c_vels = w_df[['Velocity.X', 'Velocity.Y', 'Velocity.Z']].values
-                    c_speeds = np.linalg.norm(c_vels, axis=1).tolist()
-                    
-                    if len(c_speeds) == 10:
-                        s7_curves.append({'result': outcome, 'curve': c_speeds})
-                    
-    return s7_curves
\ No newline at end of file
+
+            if instigator_id is not None and instigator_id != target_id:
+                pids.append(instigator_id)
+                stamps.append(t)
+                outcome.append(1)
+            if target_id is not None:
+                pids.append(target_id)
+                stamps.append(t)
+                outcome.append(0)
+
+    speeds = np.full((len(pids), len(GRID_OFFSETS)), np.nan, dtype=np.float32)
+    if telemetry.has_vector('velocity') and pids:
+        pids = np.asarray(pids)
+        query = np.asarray(stamps, dtype=float)[:, None] + GRID_OFFSETS * STAMPS_PER_SECOND
+        max_gap = VELOCITY_MAX_GAP_S * STAMPS_PER_SECOND
+        # one pass per player over all of that player's elims
+        for pid in np.unique(pids).tolist():
+            rows = telemetry.rows(pid)
+            subjects = np.flatnonzero(pids == pid)
+            speed = np.linalg.norm(telemetry.vector('velocity', rows), axis=1)
+            speeds[subjects] = resample(telemetry.stamp[rows], speed, query[subjects], max_gap)
+
+    return {'speeds': speeds, 'outcome': np.asarray(outcome, dtype=np.int8)}
@@ -1,13 +1,29 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-from lifelines import KaplanMeierFitter
 from config import OUTPUT_DIR
 
+def init():
+    return {'rows': []}
+
+def update(state, d):
+    if 'S7' in d:
+        state['rows'].extend(d['S7'])
+    return state
+
+def merge(state, other):
+    state['rows'].extend(other['rows'])
+    return state
+
 def run(data):
-    all_fights = []
-    for d in data: 
-        if 'S7' in d:
-            all_fights.extend(d['S7'])
+    state = init()
+    for d in data:
+        update(state, d)
+    finalize(state)
+
+def finalize(state):
+    import matplotlib.pyplot as plt
+    from lifelines import KaplanMeierFitter
+
+    all_fights = state['rows']
             
     df_surv = pd.DataFrame(all_fights)
     
@@ -1,31 +1,50 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import trueskill
 from collections import defaultdict
 import os
 from config import OUTPUT_DIR
 
-def run(data):    
-    env = trueskill.TrueSkill(draw_probability=0.0) 
-    ratings = defaultdict(env.create_rating)
+def init():
+    return {'games': []}
+
+def update(state, d):
+    # ratings depend on the order games are played in, so the partial keeps each game's
+    # ranked scores and the ratings are computed in finalize
+    if 'S8' not in d:
+        return state
+
+    player_scores = []
     
+    for p, stats in d['S8'].items():
+        k = stats['kills']
+        d_count = stats['deaths']
+        is_winner = stats.get('won', 0)
+        
+        score = (k - d_count) + (is_winner * 5)
+        player_scores.append((p, score))
+    
+    player_scores.sort(key=lambda x: x[1], reverse=True)
+    state['games'].append(player_scores)
+    return state
+
+def merge(state, other):
+    state['games'].extend(other['games'])
+    return state
+
+def run(data):
+    state = init()
     for d in data:
-        if 'S8' not in d:
-            continue
+        update(state, d)
+    finalize(state)
 
-        player_scores = []
-        
-        for p, stats in d['S8'].items():
-            k = stats['kills']
-            d_count = stats['deaths']
-            is_winner = stats.get('won', 0)
-            
-            score = (k - d_count) + (is_winner * 5)
-            player_scores.append((p, score))
-        
-        player_scores.sort(key=lambda x: x[1], reverse=True)
-        
+def finalize(state):    
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    import trueskill
+
+    env = trueskill.TrueSkill(draw_probability=0.0) 
+    ratings = defaultdict(env.create_rating)
+    
+    for player_scores in state['games']:
         groups = [] 
         ranks = [] 
         
@@ -1,18 +1,34 @@
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-from collections import defaultdict
-from sklearn.preprocessing import StandardScaler
-from sklearn.cluster import KMeans
 import os
 from config import OUTPUT_DIR
 
+def init():
+    return {'user_profiles': {}}
+
+def update(state, d):
+    for u, prof in d['S9'].items():
+        state['user_profiles'].setdefault(u, []).append(prof)
+    return state
+
+def merge(state, other):
+    for u, profs in other['user_profiles'].items():
+        state['user_profiles'].setdefault(u, []).extend(profs)
+    return state
+
 def run(data):
-    user_profiles = defaultdict(list)
+    state = init()
     for d in data:
-        for u, prof in d['S9'].items():
-            user_profiles[u].append(prof)
+        update(state, d)
+    finalize(state)
+
+def finalize(state):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    from sklearn.preprocessing import StandardScaler
+    from sklearn.cluster import KMeans
+
+    user_profiles = state['user_profiles']
     
     final_profs = []
     for u, profs in user_profiles.items():
@@ -5,40 +5,36 @@ def extract(processor):
     s12_profiles = {}
     all_users = set(processor.username_map.keys())
     
-    user_playtimes = {}
-    for user in all_users:
-        playtime_sec = 0
-        raw_ids = processor.username_map[user]
-        for raw_id in raw_ids:
-            if raw_id in processor.id_history:
-                for seg in processor.id_history[raw_id]:
-                    if seg['user'] == user:
-                        end = min(seg['end'], processor.events[-1].get('stamp', 0))
-                        playtime_sec += (end - seg['start']) / STAMPS_PER_SECOND
-        user_playtimes[user] = playtime_sec
+    user_playtimes = processor.metric('playtimes')
+    all_speeds = processor.metric('speeds')
+    telemetry_cols = processor.telemetry.columns
+    player_col = telemetry_cols.get('PlayerId', np.empty(0))
+
+    dashes_by_user = {}
+    for name in ['dash', 'kick']:
+        moves = processor.event_index.query(name)
+        movers = processor.resolve_users([e.get('player') for e in moves], [e.get('stamp') for e in moves])
+        for u in movers:
+            dashes_by_user[u] = dashes_by_user.get(u, 0) + 1
 
     for user in all_users:
         raw_ids = processor.username_map[user]
         
-        user_df = processor.df_update[processor.df_update['PlayerId'].isin(raw_ids)]
+        user_mask = np.isin(player_col, raw_ids)
         
         high_speed_ticks = 0
         total_roll = 0
         tick_count = 0
         
-        if not user_df.empty:
-            vels = user_df[['Velocity.X', 'Velocity.Y', 'Velocity.Z']].values
-            speeds = np.linalg.norm(vels, axis=1)
+        if user_mask.any():
+            speeds = all_speeds[user_mask]
             high_speed_ticks = np.sum(speeds > HIGH_SPEED_THRESHOLD)
             
-            if 'Rotation.Roll' in user_df.columns:
-                total_roll = user_df['Rotation.Roll'].abs().sum()
-                tick_count = len(user_df)
+            if 'Rotation.Roll' in telemetry_cols:
+                total_roll = np.abs(telemetry_cols['Rotation.Roll'][user_mask]).sum()
+                tick_count = int(user_mask.sum())
 
-        dashes = 0
-        for e in processor.events:
-            if e.get('name') in ['dash', 'kick'] and processor.resolve_user(e.get('player'), e.get('stamp')) == user:
-                dashes += 1
+        dashes = dashes_by_user.get(user, 0)
         
         user_fights = [f for f in processor.fights if user in f['participants_user']]
         total_dist = sum(f['start_dist'] for f in user_fights)
@@ -0,0 +1,47 @@
+# Each study: the analysis module that produces its outputs and the per-game ETL outputs
+# (keys of the dict returned by game_etl.process_single_file) that it reads.
+STUDIES = {
+    's0': {'analysis': 'studies.s0_metadata_analysis', 'consumes': ['S0']},
+    's1': {'analysis': 'studies.s1_summary_analysis', 'consumes': ['S1']},
+    's2': {'analysis': 'studies.s2_health_analysis', 'consumes': ['S2']},
+    's3': {'analysis': 'studies.s3_winrate_analysis', 'consumes': ['S3']},
+    's4': {'analysis': 'studies.s4_spatial_analysis', 'consumes': ['S4']},
+    's5': {'analysis': 'studies.s5_sequence_analysis', 'consumes': ['S5']},
+    's6': {'analysis': 'studies.s6_velocity_analysis', 'consumes': ['S6']},
+    's7': {'analysis': 'studies.s7_survival_analysis', 'consumes': ['S7']},
+    's8': {'analysis': 'studies.s8_trueskill_analysis', 'consumes': ['S8']},
+    's9': {'analysis': 'studies.s9_archetype_analysis', 'consumes': ['S9']},
+    's10': {'analysis': 'studies.s10_performance_analysis', 'consumes': ['S10']}
+}
+
+
+def select_studies(names=None):
+    # names: iterable of study ids ("s3") or a comma separated string ("s3,s7"); None selects all
+    if names is None:
+        return list(STUDIES.keys())
+    if isinstance(names, str):
+        names = names.split(',')
+
+    selected = []
+    for name in names:
+        name = name.strip().lower()
+        if not name:
+            continue
+        if name not in STUDIES:
+            raise ValueError(f"unknown study '{name}' (choose from {', '.join(STUDIES.keys())})")
+        if name not in selected:
+            selected.append(name)
+    return selected
+
+
+def required_extracts(studies):
+    keys = []
+    for name in studies:
+        for key in STUDIES[name]['consumes']:
+            if key not in keys:
+                keys.append(key)
+    return keys
+
+
+def analysis_modules(studies):
+    return [STUDIES[name]['analysis'] for name in studies]
@@ -0,0 +1,215 @@
+import argparse
+import codecs
+import json
+import os
+import re
+
+import numpy as np
+
+from config import STAMPS_PER_SECOND
+
+# Synthetic games in the export format: Match JSON (utf-16 with BOM, CRLF, tab indents, whole
+# floats written as "12." and a trailing comma after the last event), PlayerUpdate CSV and one
+# Performance CSV per player. Used by benchmark.py to see how the pipeline scales.
+
+MAPS = ['Observatory', 'Outpost', 'Stadium', 'Prison']
+ITEMS = ['Spark', 'Grapple', 'Sledge', 'Nightshade', 'AstroRifle', 'ThrowingStar', 'Sword',
+         'Ripper', 'RocketLauncher', 'Boomerang', 'Net', 'Teleport', 'QuadCannon']
+ACTIONS = ['fire', 'swing', 'stab', 'throw']
+MOVES = ['dash', 'surface_lock', 'push_off', 'kick', 'start_reload', 'finish_reload', 'block']
+
+UPDATE_COLUMNS = ['Stamp', 'PlayerId', 'Health', 'Location.X', 'Location.Y', 'Location.Z',
+                  'Rotation.Pitch', 'Rotation.Yaw', 'Rotation.Roll', 'Velocity.X', 'Velocity.Y', 'Velocity.Z']
+UPDATE_INTERVAL = 20
+
+PERF_COLUMNS = [
+    'Stamp', 'NumFrameSamples', 'Frame Avg', 'Frame Q95', 'Frame Max', 'GT Avg', 'GT Q95', 'GT Max',
+    'NTT Avg', 'NTT Q95', 'NTT Max', 'RT Avg', 'RT Q95', 'RT Max', 'RHIT Avg', 'RHIT Q95', 'RHIT Max',
+    'GPU Avg', 'GPU Q95', 'GPU Max', 'GameDriverTickFlush', 'GT Bound', 'NTT Bound', 'RT Bound',
+    'RHIT Bound', 'GPU Bound', 'Unknown Hitches', 'GT Hitches', 'NTT Hitches', 'RT Hitches',
+    'RHIT Hitches', 'GPU Hitches', 'Num GCs', 'Acc GC Time', 'RAM MB', 'VRAM MB', 'Objects',
+    'Components', 'Actors', 'Packet Latency', 'Packet Jitter', 'In Packet Loss', 'Out Packet Loss'
+]
+PERF_INTERVAL = 320
+RESPAWN_STAMPS = 120
+
+
+def _events(rng, n_players, duration_sec, event_rate, fight_rate):
+    end = int(duration_sec * STAMPS_PER_SECOND)
+    names = [f"player_{i}" for i in range(n_players)]
+    events = []
+    held = {}
+
+    for pid, username in enumerate(names):
+        held[pid] = ITEMS[rng.integers(len(ITEMS))]
+        events += [
+            {'name': 'join', 'stamp': 0, 'username': username, 'id': pid, 'net_id': f"|{rng.integers(1 << 62):032x}"},
+            {'name': 'set_loadout', 'stamp': 0, 'player': pid, 'items': [held[pid], ITEMS[rng.integers(len(ITEMS))]]},
+            {'name': 'set_team', 'stamp': 1, 'player': pid, 'team': pid},
+            {'name': 'spawn', 'stamp': 1, 'player': pid},
+            {'name': 'equip', 'stamp': 2, 'player': pid, 'item': held[pid]}
+        ]
+
+    # background activity: movement, actions and weapon swaps at event_rate per player-second
+    n_background = rng.poisson(event_rate * n_players * duration_sec)
+    stamps = np.sort(rng.integers(3, end, n_background))
+    players = rng.integers(n_players, size=n_background)
+    kinds = rng.random(n_background)
+    for t, pid, kind in zip(stamps.tolist(), players.tolist(), kinds.tolist()):
+        if kind < 0.05:
+            held[pid] = ITEMS[rng.integers(len(ITEMS))]
+            events.append({'name': 'equip', 'stamp': t, 'player': pid, 'item': held[pid]})
+        elif kind < 0.45:
+            events.append({'name': ACTIONS[rng.integers(len(ACTIONS))], 'stamp': t, 'player': pid})
+        else:
+            events.append({'name': MOVES[rng.integers(len(MOVES))], 'stamp': t, 'player': pid})
+
+    # fights: a pair trades fire and damage until the target dies or both stop
+    n_fights = rng.poisson(fight_rate * n_players * duration_sec / 60.0)
+    for start in np.sort(rng.integers(3, max(4, end - 400), n_fights)).tolist():
+        a, b = rng.choice(n_players, 2, replace=False).tolist() if n_players > 1 else (0, 0)
+        if a == b:
+            continue
+        t = start
+        health = {a: 10, b: 10}
+        for _ in range(rng.integers(1, 8)):
+            shooter, target = (a, b) if rng.random() < 0.6 else (b, a)
+            events.append({'name': 'fire', 'stamp': t, 'player': shooter, 'damager': f"Projectile:{t}:0"})
+            t += int(rng.integers(5, 40))
+            dmg = int(rng.choice([1, 2, 4, 5, 10], p=[0.5, 0.2, 0.15, 0.1, 0.05]))
+            events.append({'name': 'damage', 'stamp': t, 'target': target, 'damage': dmg,
+                           'prev_health': health[target], 'instigator': shooter,
+                           'causer': f"Projectile:{t}:0", 'item': held[shooter]})
+            health[target] -= dmg
+            if health[target] <= 0:
+                t += int(rng.integers(1, 20))
+                events.append({'name': 'elim', 'stamp': t, 'target': target, 'instigator': shooter,
+                               'causer': f"Projectile:{t}:1", 'item': held[shooter]})
+                events.append({'name': 'spawn', 'stamp': t + RESPAWN_STAMPS, 'player': target})
+                events.append({'name': 'equip', 'stamp': t + RESPAWN_STAMPS + 1, 'player': target, 'item': held[target]})
+                break
+            t += int(rng.integers(10, 60))
+
+    events = [e for e in events if e['stamp'] < end]
+    events.sort(key=lambda e: e['stamp'])
+    return events, names
+
+
+def _header(rng, game_id, names, events, duration_sec):
+    kills = {u: 0 for u in names}
+    deaths = {u: 0 for u in names}
+    for e in events:
+        if e['name'] == 'elim':
+            kills[names[e['instigator']]] += 1
+            deaths[names[e['target']]] += 1
+
+    return {
+        'GameId': game_id.lstrip('g'),
+        'StartUnixTimestamp': str(1763000000 + int(rng.integers(1000000))),
+        'GameMode': 'Free For All',
+        'DurationSec': int(duration_sec),
+        'Map': MAPS[rng.integers(len(MAPS))],
+        'winner': max(names, key=lambda u: kills[u]) if names else None,
+        'AverageKillDistance': float(rng.integers(500, 1500)),
+        'TotalEliminations': sum(kills.values()),
+        'TotalSpawns': sum(1 for e in events if e['name'] == 'spawn'),
+        'DeviceProfiles': [{
+            'Username': u,
+            'PlayerId': None,
+            'GPU': {'Name': 'Synthetic GPU', 'VideoMemoryMB': 8192},
+            'Settings': {'ResX': 1920, 'ResY': 1080, 'WindowMode': 'WindowedFullscreen',
+                         'FrameRateLimit': int(rng.choice([0, 60, 120, 144]))}
+        } for u in names],
+        'Players': {u: {'Kills': kills[u], 'Deaths': deaths[u], 'AvgSpeed': float(rng.integers(300, 600)),
+                        'PlayTimeSec': float(duration_sec)} for u in names}
+    }
+
+
+def _write_json(path, header, events, encoding):
+    text = json.dumps(header, indent='\t', ensure_ascii=False)
+    # whole floats the way the exporter writes them ("491.")
+    text = re.sub(r'(?<=\d)\.0(?=[,\n])', '.', text)
+    event_text = json.dumps(events, indent='\t', ensure_ascii=False).replace('\n', '\n\t')
+    if events:
+        event_text = event_text[:-3] + ',' + event_text[-3:]
+    text = text[:-2] + ',\n\t"events": ' + event_text + '\n}'
+    text = text.replace('\n', '\r\n')
+
+    with open(path, 'wb') as f:
+        if encoding == 'utf-16':
+            f.write(codecs.BOM_UTF16_LE)
+            f.write(text.encode('utf-16-le'))
+        else:
+            f.write(text.encode('utf-8'))
+
+
+def _write_updates(rng, path, n_players, duration_sec):
+    stamps = np.arange(UPDATE_INTERVAL, int(duration_sec * STAMPS_PER_SECOND), UPDATE_INTERVAL)
+    n = len(stamps) * n_players
+    rows = np.zeros((n, len(UPDATE_COLUMNS)), dtype=np.int64)
+    rows[:, 0] = np.repeat(stamps, n_players)
+    rows[:, 1] = np.tile(np.arange(n_players), len(stamps))
+    rows[:, 2] = 10
+
+    # random walk per player, velocity is the step per second
+    steps = rng.normal(0, 12, size=(len(stamps), n_players, 3))
+    location = np.cumsum(steps, axis=0) + rng.uniform(-5000, 5000, size=(1, n_players, 3))
+    rows[:, 3:6] = location.reshape(n, 3).round()
+    rows[:, 6] = rng.integers(-90, 90, n)
+    rows[:, 7] = rng.integers(-180, 180, n)
+    rows[:, 8] = rng.integers(-180, 180, n)
+    rows[:, 9:12] = (steps.reshape(n, 3) * STAMPS_PER_SECOND / UPDATE_INTERVAL).round()
+
+    np.savetxt(path, rows, fmt='%d', delimiter=', ', header=', '.join(UPDATE_COLUMNS), comments='')
+
+
+def _write_perf(rng, path, duration_sec):
+    stamps = np.arange(PERF_INTERVAL, int(duration_sec * STAMPS_PER_SECOND), PERF_INTERVAL)
+    n = len(stamps)
+    values = np.abs(rng.normal(3.0, 1.0, size=(n, len(PERF_COLUMNS)))).round(1)
+    values[:, 0] = stamps
+    values[:, 1] = 600
+    for col in ['GT Bound', 'NTT Bound', 'RT Bound', 'RHIT Bound', 'GPU Bound']:
+        values[:, PERF_COLUMNS.index(col)] = rng.integers(0, 4, n)
+    values[:, PERF_COLUMNS.index('Packet Latency')] = rng.gamma(4.0, 8.0, n).round(1)
+    np.savetxt(path, values, fmt='%g', delimiter=', ', header=', '.join(PERF_COLUMNS), comments='')
+
+
+def generate_match(out_dir, game_id, n_players=8, duration_sec=300, event_rate=0.85, fight_rate=1.0,
+                   seed=0, encoding='utf-16'):
+    # event_rate: background events per player per second; fight_rate: fights per player per minute
+    rng = np.random.default_rng(seed)
+    os.makedirs(out_dir, exist_ok=True)
+
+    events, names = _events(rng, n_players, duration_sec, event_rate, fight_rate)
+    header = _header(rng, game_id, names, events, duration_sec)
+
+    j_path = os.path.join(out_dir, f"Match_{game_id}.json")
+    u_path = os.path.join(out_dir, f"PlayerUpdate_{game_id}.csv")
+    _write_json(j_path, header, events, encoding)
+    _write_updates(rng, u_path, n_players, duration_sec)
+
+    p_paths = []
+    for username in names:
+        p_path = os.path.join(out_dir, f"Performance_{username}_{game_id}.csv")
+        _write_perf(rng, p_path, duration_sec)
+        p_paths.append(p_path)
+
+    return game_id, j_path, u_path, p_paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="write synthetic Astro games for benchmarking")
+    parser.add_argument("--out", default="synthetic_data")
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--players", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=300, help="match length in seconds")
+    parser.add_argument("--event-rate", type=float, default=0.85, help="background events per player per second")
+    parser.add_argument("--fight-rate", type=float, default=1.0, help="fights per player per minute")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for i in range(args.games):
+        generate_match(args.out, f"g{900000000000000000 + args.seed * 100000 + i}", args.players, args.duration,
+                       args.event_rate, args.fight_rate, seed=args.seed * 100000 + i)
+    print(f"wrote {args.games} games to {args.out}/")
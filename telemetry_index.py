@@ -0,0 +1,100 @@
+import numpy as np
+
+from export_csv import read_export_csv
+
+# PlayerUpdate schema: stamps fit int32, player ids int16 and health int8; the vectors are float32
+UPDATE_DTYPES = {
+    'Stamp': np.int32,
+    'PlayerId': np.int16,
+    'Health': np.int8,
+    'Location.X': np.float32, 'Location.Y': np.float32, 'Location.Z': np.float32,
+    'Rotation.Pitch': np.float32, 'Rotation.Yaw': np.float32, 'Rotation.Roll': np.float32,
+    'Velocity.X': np.float32, 'Velocity.Y': np.float32, 'Velocity.Z': np.float32
+}
+
+VECTOR_COLUMNS = {
+    'location': ['Location.X', 'Location.Y', 'Location.Z'],
+    'rotation': ['Rotation.Pitch', 'Rotation.Yaw', 'Rotation.Roll'],
+    'velocity': ['Velocity.X', 'Velocity.Y', 'Velocity.Z']
+}
+
+
+def read_updates(path, usecols=None):
+    return read_export_csv(path, usecols, UPDATE_DTYPES)
+
+
+class TelemetryIndex:
+    # PlayerUpdate rows regrouped by PlayerId and sorted by Stamp, so every player's samples
+    # are one contiguous block. Lookups return slices into these arrays (numpy views, no copies).
+
+    def __init__(self, df, id_col='PlayerId', stamp_col='Stamp'):
+        self.bounds = {}
+        self.columns = {}
+        self.vectors = {}
+
+        if df.empty or id_col not in df.columns or stamp_col not in df.columns:
+            self.stamp = np.empty(0, dtype=np.int64)
+            return
+
+        pids = df[id_col].to_numpy()
+        stamps = df[stamp_col].to_numpy()
+        # lexsort is stable, so rows that share a stamp keep their file order
+        order = np.lexsort((stamps, pids))
+
+        # one sorted copy of the data: each vector is an (n, 3) block and its columns are views of it
+        vector_cols = {}
+        for name, cols in VECTOR_COLUMNS.items():
+            if all(c in df.columns for c in cols):
+                block = np.empty((len(df), 3), dtype=np.result_type(*[df[c].dtype for c in cols]))
+                for i, c in enumerate(cols):
+                    block[:, i] = df[c].to_numpy()[order]
+                    vector_cols[c] = block[:, i]
+                self.vectors[name] = block
+        for col in df.columns:
+            self.columns[col] = vector_cols[col] if col in vector_cols else df[col].to_numpy()[order]
+
+        self.stamp = self.columns[stamp_col]
+        sorted_pids = self.columns[id_col]
+        unique_pids, starts, counts = np.unique(sorted_pids, return_index=True, return_counts=True)
+        for pid, start, count in zip(unique_pids.tolist(), starts.tolist(), counts.tolist()):
+            self.bounds[pid] = (start, start + count)
+
+    def __contains__(self, pid):
+        return pid in self.bounds
+
+    def player_ids(self):
+        return list(self.bounds.keys())
+
+    def rows(self, pid):
+        lo, hi = self.bounds.get(pid, (0, 0))
+        return slice(lo, hi)
+
+    def window(self, pid, start, end, closed=True):
+        # rows of pid with start <= Stamp <= end (or < end when closed=False)
+        lo, hi = self.bounds.get(pid, (0, 0))
+        if lo == hi:
+            return slice(0, 0)
+        stamps = self.stamp[lo:hi]
+        a = np.searchsorted(stamps, start, side='left')
+        b = np.searchsorted(stamps, end, side='right' if closed else 'left')
+        return slice(lo + int(a), lo + int(max(a, b)))
+
+    def first_within(self, pid, stamp, within):
+        # earliest row of pid with |Stamp - stamp| < within
+        lo, hi = self.bounds.get(pid, (0, 0))
+        if lo == hi:
+            return None
+        stamps = self.stamp[lo:hi]
+        i = int(np.searchsorted(stamps, stamp - within, side='right'))
+        if i < len(stamps) and abs(stamps[i] - stamp) < within:
+            return lo + i
+        return None
+
+    def get(self, col, rows):
+        return self.columns[col][rows]
+
+    def vector(self, name, rows):
+        return self.vectors[name][rows]
+
+    def has_vector(self, name):
+        return name in self.vectors
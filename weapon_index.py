@@ -0,0 +1,69 @@
+import numpy as np
+
+DEFAULT_ITEM = "Default"
+
+
+class WeaponIndex:
+    # equip history per raw id as stamp-sorted arrays of item codes
+
+    def __init__(self, weapon_timeline):
+        self.items = []
+        codes_by_name = {}
+        per_pid = {}
+        for entry in weapon_timeline:
+            item = entry['item']
+            if item not in codes_by_name:
+                codes_by_name[item] = len(self.items)
+                self.items.append(item)
+            per_pid.setdefault(entry['pid'], []).append((entry['time'], codes_by_name[item]))
+
+        self.stamps = {}
+        self.codes = {}
+        for pid, rows in per_pid.items():
+            # stable sort: the last equip at a given stamp wins, as in the event order
+            rows.sort(key=lambda r: r[0])
+            self.stamps[pid] = np.array([r[0] for r in rows])
+            self.codes[pid] = np.array([r[1] for r in rows], dtype=np.int32)
+
+        self.item_array = np.array(self.items + [DEFAULT_ITEM], dtype=object)
+        self.default_code = len(self.items)
+
+    def __contains__(self, pid):
+        return pid in self.stamps
+
+    def player_ids(self):
+        return list(self.stamps.keys())
+
+    def item_at(self, pid, timestamp, session_start=0):
+        stamps = self.stamps.get(pid)
+        if stamps is None:
+            return DEFAULT_ITEM
+        i = int(np.searchsorted(stamps, timestamp, side='right')) - 1
+        if i < 0 or stamps[i] < session_start:
+            return DEFAULT_ITEM
+        return self.items[self.codes[pid][i]]
+
+    def codes_at(self, pids, timestamps, session_starts):
+        pids = np.asarray(pids, dtype=object)
+        timestamps = np.asarray(timestamps)
+        session_starts = np.asarray(session_starts)
+        out = np.full(len(pids), self.default_code, dtype=np.int32)
+
+        for pid in set(pids.tolist()):
+            stamps = self.stamps.get(pid)
+            if stamps is None:
+                continue
+            mask = pids == pid
+            idx = np.searchsorted(stamps, timestamps[mask], side='right') - 1
+            found = idx >= 0
+            idx = np.maximum(idx, 0)
+            found &= stamps[idx] >= session_starts[mask]
+            out[mask] = np.where(found, self.codes[pid][idx], self.default_code)
+        return out
+
+    def items_at(self, pids, timestamps, session_starts):
+        return self.item_array[self.codes_at(pids, timestamps, session_starts)]
+
+    def hold_spans(self, pid):
+        # (stamps, codes) of pid's equips; entry i is held from stamps[i] until stamps[i + 1]
+        return self.stamps.get(pid, np.empty(0)), self.codes.get(pid, np.empty(0, dtype=np.int32))